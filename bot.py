@@ -1,59 +1,227 @@
 # bot.py (Part 1/5)
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands # Use this for slash command specifics
 import json
 import os
 import io
+import re
 import asyncio
+import functools
+import time
+from collections import defaultdict, deque
+from pathlib import Path
 from dotenv import load_dotenv
-import traceback
+import atexit
+import logging
+import logging.handlers
+import queue
 from datetime import datetime
 
+# --- LOGGING ---
+# Records are queued and written to stderr by a listener thread, so a slow console never stalls the event loop.
+# discord.py's own loggers propagate to the root logger and go through the same queue.
+log = logging.getLogger("ticketbot")
+_log_queue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter('[{asctime}] [{levelname:<8}] {name}: {message}', '%Y-%m-%d %H:%M:%S', style='{'))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream_handler)
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    # The stock prepare() formats the message and traceback on the calling thread (the event loop).
+    # The queue is in-process, so nothing is pickled: pass the record through and let the listener format it.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+logging.getLogger().addHandler(_DeferredQueueHandler(_log_queue))
+logging.getLogger().setLevel(logging.INFO)
+_log_listener.start()
+atexit.register(_log_listener.stop) # Drain queued records on exit
+
+# orjson is much faster at (de)serializing settings; fall back to the stdlib if it isn't installed
+try:
+    import orjson
+    def json_loads(data): return orjson.loads(data)
+    def json_dumps(obj) -> bytes: return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS) # Int keys (blacklist IDs) become strings, like the stdlib
+except ImportError:
+    orjson = None
+    def json_loads(data): return json.loads(data)
+    def json_dumps(obj) -> bytes: return json.dumps(obj, indent=4).encode('utf-8')
+
 # --- SETTINGS MANAGEMENT (for multi-server) ---
 SETTINGS_FILE = 'settings.json'
 
-def load_settings():
-    """Loads settings from settings.json, creating it if it doesn't exist."""
-    if not os.path.exists(SETTINGS_FILE):
+def load_settings() -> dict:
+    """Loads settings from settings.json, creating it if it doesn't exist. Always returns a dict."""
+    try:
+        # Read the raw bytes once and hand them straight to the parser (no str decode step)
+        raw = Path(SETTINGS_FILE).read_bytes()
+    except FileNotFoundError:
         # Log info level, not necessarily an error if it's the first run
-        print(f"[INFO] {SETTINGS_FILE} not found. Creating a new one.")
+        log.info("%s not found. Creating a new one.", SETTINGS_FILE)
         try:
-            with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
-                json.dump({}, f)
-            return {} # Return empty dict after creating
+            Path(SETTINGS_FILE).write_bytes(json_dumps({}))
         except IOError as e:
-            print(f"[ERROR] Could not create {SETTINGS_FILE}: {e}")
-            return {} # Return empty dict if creation fails
+            log.error("Could not create %s: %s", SETTINGS_FILE, e)
+        return {} # Return empty dict whether or not creation succeeded
+    except Exception as e:
+        log.exception("Could not read %s: %s", SETTINGS_FILE, e)
+        return {}
+    # Ensure file has content before trying to parse
+    if not raw:
+        log.warning("%s is empty. Using default settings.", SETTINGS_FILE)
+        return {}
     try:
-        # Ensure file has content before trying to load
-        if os.path.getsize(SETTINGS_FILE) == 0:
-            print(f"[WARNING] {SETTINGS_FILE} is empty. Using default settings.")
+        settings = json_loads(raw)
+        if not isinstance(settings, dict):
+            log.error("%s does not contain a JSON object. Using empty settings.", SETTINGS_FILE)
             return {}
-        with open(SETTINGS_FILE, 'r', encoding='utf-8') as f: # Specify encoding
-            return json.load(f)
-    except json.JSONDecodeError:
+        return settings
+    except json.JSONDecodeError: # orjson.JSONDecodeError subclasses this
         # Log as error, as file exists but is invalid
-        print(f"[ERROR] {SETTINGS_FILE} is corrupted. Please fix or delete it. Using empty settings.")
+        log.error("%s is corrupted. Please fix or delete it. Using empty settings.", SETTINGS_FILE)
         # Optionally backup corrupted file here
         # try: os.rename(SETTINGS_FILE, SETTINGS_FILE + f'.corrupted_{int(time.time())}')
         # except OSError: pass
         return {}
     except Exception as e:
-        print(f"[ERROR] Unexpected error loading settings: {e}")
-        traceback.print_exc() # Print full traceback for loading errors
+        log.exception("Unexpected error loading settings: %s", e)
         return {}
 
 
-def save_settings(settings):
-    """Saves settings to settings.json"""
+def serialize_settings(settings) -> bytes:
+    """Serializes settings to the on-disk JSON format (UTF-8 bytes)."""
+    return json_dumps(settings)
+
+def write_settings_file(payload: bytes) -> bool:
+    """Writes already-serialized settings to settings.json (blocking). Returns True on success."""
+    # Write to a temp file and atomically swap it in, so a crash mid-write
+    # can never leave settings.json truncated or half-written
+    tmp_file = SETTINGS_FILE + '.tmp'
     try:
-        with open(SETTINGS_FILE, 'w', encoding='utf-8') as f: # Specify encoding
-            json.dump(settings, f, indent=4)
+        with open(tmp_file, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno()) # Make sure the data is on disk before the rename
+        os.replace(tmp_file, SETTINGS_FILE)
+        return True
     except Exception as e:
-        print(f"[ERROR] Could not save settings to {SETTINGS_FILE}: {e}")
-        traceback.print_exc() # Print full traceback for saving errors
+        log.exception("Could not save settings to %s: %s", SETTINGS_FILE, e)
+        try: os.remove(tmp_file)
+        except OSError: pass
+        return False
+
+# How long mutations are coalesced before settings.json is rewritten
+SETTINGS_FLUSH_INTERVAL = 1.5
+
+# --- TICKET TOPIC PARSING ---
+# Ticket channel topics carry a marker like "ticket-user-<id> type-<type>"
+TICKET_TOPIC_RE = re.compile(r"ticket-user-(\d+)(?: type-(\w+))?")
+
+def parse_ticket_topic(topic: str):
+    """Returns (user_id, ticket_type) from a ticket channel topic, or None if it has no marker."""
+    if not topic:
+        return None
+    match = TICKET_TOPIC_RE.search(topic)
+    if not match:
+        return None
+    return int(match.group(1)), match.group(2)
+
+# Claimed tickets additionally carry "claimed-by-<id>" in their topic
+CLAIMED_BY_RE = re.compile(r"claimed-by-(\d+)")
+
+# Appeal embeds sent to staff carry the appealing user in their footer: "User ID: <id>"
+APPEAL_USER_ID_RE = re.compile(r"User ID:\s*(\d+)")
+
+def parse_claimer(topic: str):
+    """Returns the ID of the staff member who claimed a ticket, or None if unclaimed."""
+    match = CLAIMED_BY_RE.search(topic) if topic else None
+    return int(match.group(1)) if match else None
+
+def build_ticket_topic(topic: str, channel_id: int, claimer_id: int = None) -> str:
+    """Rebuilds a ticket topic from its user/type markers, optionally adding a claimer marker."""
+    parsed = parse_ticket_topic(topic)
+    parts = [f"ticket-user-{parsed[0] if parsed else channel_id}"]
+    if parsed and parsed[1]: parts.append(f"type-{parsed[1]}")
+    if claimer_id: parts.append(f"claimed-by-{claimer_id}")
+    return " ".join(parts)[:1024] # Topic length limit
+
+# Settings that must be configured before tickets can be created
+REQUIRED_SETTINGS = ('panel_channel', 'ticket_category', 'archive_category', 'staff_role')
+
+# --- EMBED COLORS ---
+# Shared Color instances so reply paths don't construct a new one per embed
+COLOR_BLUE = discord.Color.blue()
+COLOR_BLURPLE = discord.Color.blurple()
+COLOR_BRAND_GREEN = discord.Color.brand_green()
+COLOR_DARK_RED = discord.Color.dark_red()
+COLOR_GOLD = discord.Color.gold()
+COLOR_GREEN = discord.Color.green()
+COLOR_GREYPLE = discord.Color.greyple()
+COLOR_LIGHT_GREY = discord.Color.light_grey()
+COLOR_ORANGE = discord.Color.orange()
+COLOR_RED = discord.Color.red()
+
+# --- PERMISSION OVERWRITES ---
+# The overwrite objects never change, so they are built once and shared between channels
+OVERWRITE_HIDDEN = discord.PermissionOverwrite(view_channel=False) # Hide from @everyone
+OVERWRITE_TICKET_USER = discord.PermissionOverwrite(view_channel=True, read_messages=True, send_messages=True, attach_files=True, embed_links=True) # Allow user basic perms
+OVERWRITE_TICKET_BOT = discord.PermissionOverwrite(view_channel=True, read_messages=True, send_messages=True, embed_links=True, attach_files=True, manage_channels=True, manage_permissions=True, manage_messages=True) # Bot needs extensive perms
+OVERWRITE_TICKET_STAFF = discord.PermissionOverwrite(view_channel=True, read_messages=True, send_messages=True, manage_messages=True, attach_files=True, embed_links=True) # Allow staff necessary perms
+OVERWRITE_ARCHIVE_BOT = discord.PermissionOverwrite(view_channel=True, read_messages=True, send_messages=True)
+OVERWRITE_ARCHIVE_STAFF = discord.PermissionOverwrite(view_channel=True, read_messages=True, send_messages=False) # Staff can read archives only
+
+# --- CHANNEL NAME SANITIZING ---
+class ChannelNameTable(dict):
+    """str.translate table keeping alphanumerics (plus any extra mappings), filled lazily per code point."""
+    def __missing__(self, codepoint: int):
+        value = codepoint if chr(codepoint).isalnum() else None # None deletes the character
+        self[codepoint] = value
+        return value
+
+# Ticket channel names: alphanumerics, '-' and '_'
+TICKET_NAME_TABLE = ChannelNameTable({ord('-'): ord('-'), ord('_'): ord('_')})
+# Renamed channels: same, but spaces become hyphens
+RENAME_TABLE = ChannelNameTable({ord('-'): ord('-'), ord('_'): ord('_'), ord(' '): ord('-')})
+
+# Discord allows only 2 name/topic edits per channel every 10 minutes; past that, discord.py
+# silently sleeps in its ratelimiter for minutes. Track edits ourselves and refuse instead.
+CHANNEL_EDIT_LIMIT = 2
+CHANNEL_EDIT_WINDOW = 600 # Seconds
+_channel_edit_bucket: dict[int, deque] = defaultdict(deque) # channel_id -> monotonic timestamps of recent name/topic edits
+
+def channel_edit_retry_after(channel_id: int) -> float:
+    """Returns how many seconds until the channel's name/topic can be edited again (0 if it can now)."""
+    if not (bucket := _channel_edit_bucket.get(channel_id)): return 0.0
+    now = time.monotonic()
+    while bucket and now - bucket[0] >= CHANNEL_EDIT_WINDOW: bucket.popleft()
+    if not bucket: del _channel_edit_bucket[channel_id]; return 0.0
+    return CHANNEL_EDIT_WINDOW - (now - bucket[0]) if len(bucket) >= CHANNEL_EDIT_LIMIT else 0.0
+
+async def safe_channel_edit(channel: discord.TextChannel, **kwargs) -> float:
+    """channel.edit() that skips no-op name/topic changes and refuses ones Discord would rate limit.
+    Returns 0 if the edit went through, otherwise the seconds to wait before retrying."""
+    if "name" in kwargs and kwargs["name"] == channel.name: del kwargs["name"]
+    if "topic" in kwargs and (kwargs["topic"] or None) == (channel.topic or None): del kwargs["topic"]
+    limited = "name" in kwargs or "topic" in kwargs
+    if limited and (retry_after := channel_edit_retry_after(channel.id)): return retry_after
+    if kwargs.keys() - {"reason"}: await channel.edit(**kwargs) # Nothing left to change otherwise
+    if limited: _channel_edit_bucket[channel.id].append(time.monotonic())
+    return 0.0
+
+# wait_for('message') predicate: a message from one user in one channel, checked with plain ID compares
+class MessageFromCheck:
+    __slots__ = ('user_id', 'channel_id', 'require_image')
+
+    def __init__(self, user: discord.abc.User, channel: discord.abc.Messageable, require_image: bool = False):
+        self.user_id = user.id; self.channel_id = channel.id; self.require_image = require_image
+
+    def __call__(self, message: discord.Message) -> bool:
+        if message.author.id != self.user_id or message.channel.id != self.channel_id: return False
+        if not self.require_image: return True
+        content_type = message.attachments[0].content_type if message.attachments else None
+        return bool(content_type and content_type.startswith('image'))
 
 # --- BOT SETUP ---
 
@@ -62,7 +230,7 @@ load_dotenv()
 TOKEN = os.getenv('DISCORD_TOKEN')
 
 if not TOKEN:
-    print("[CRITICAL ERROR] DISCORD_TOKEN not found in .env file or environment variables. Bot cannot start.")
+    log.critical("DISCORD_TOKEN not found in .env file or environment variables. Bot cannot start.")
     exit(1) # Exit with error code
 
 # Define intents required by the bot
@@ -82,55 +250,315 @@ class TicketBot(commands.Bot):
                          help_command=None) # Disable default help command
         self.settings = load_settings() # Load settings on initialization
         self.persistent_views_added = False
+        # Settings writes are batched: mutations only mark the settings dirty,
+        # and the background flusher rewrites settings.json once per interval
+        self._settings_dirty = False
+        self._save_lock = asyncio.Lock()
+        # Validated per-guild settings dicts keyed by guild ID. Each entry is the same
+        # object stored in self.settings, so mutations through it are persisted.
+        self._guild_cache: dict[int, dict] = {}
+        # Open tickets per guild: {guild_id: {user_id: {ticket_type: {channel_id, ...}}}}
+        self.ticket_index: dict[int, dict[int, dict[str, set[int]]]] = {}
+        # Reverse lookup used to drop a channel from the index: {channel_id: (guild_id, user_id, ticket_type)}
+        self._ticket_channels: dict[int, tuple[int, int, str]] = {}
+        # Number of indexed open tickets per guild, kept in step with the index: {guild_id: count}
+        self._open_ticket_counts: dict[int, int] = {}
+        # Role/channel objects resolved from settings IDs: {guild_id: {setting_key: object}}
+        self._resolved: dict[int, dict[str, object]] = {}
+        # Whether all REQUIRED_SETTINGS are set, per guild; recomputed only when one of them changes
+        # (kept here rather than in the settings dict so it is never written to settings.json)
+        self._setup_complete: dict[int, bool] = {}
+        # Guild-wide overwrite dicts for new and archived tickets: {guild_id: {'ticket'|'archive': overwrites}}
+        self._overwrite_cache: dict[int, dict[str, dict]] = {}
+        # Live appeal prompt per (guild_id, user_id), so repeated clicks by a blacklisted user don't stack DMs and views
+        self._appeal_prompts: dict[tuple[int, int], discord.ui.View] = {}
+        # Channel deletions waiting on their countdown: {channel_id: TimerHandle}; the running delete tasks are kept referenced
+        self._pending_deletes: dict[int, asyncio.TimerHandle] = {}
+        self._delete_tasks: set[asyncio.Task] = set()
+        # Appeal questionnaire replies being awaited per DM channel: {channel_id: [(user_id, Future), ...]}
+        # (a list, since a user blacklisted in several guilds can run several questionnaires in one DM)
+        self._dm_waiters: dict[int, list[tuple[int, asyncio.Future]]] = {}
 
     async def setup_hook(self):
         # This is run once internally by discord.py before the bot is ready
         # Register persistent views here so they work after restarts
         if not self.persistent_views_added:
-            # Pass self (the bot instance) to the views upon initialization
-            self.add_view(TicketPanelView(self))
-            self.add_view(TicketCloseView(self))
-            self.add_view(AppealReviewView(self))
+            # Pass self (the bot instance) to the views upon initialization.
+            # These views are stateless (timeout=None, fixed custom_ids), so the same
+            # instances are reused for every message they are attached to.
+            self.ticket_panel_view = TicketPanelView(self)
+            self.ticket_close_view = TicketCloseView(self)
+            self.appeal_review_view = AppealReviewView(self)
+            self.add_view(self.ticket_panel_view)
+            self.add_view(self.ticket_close_view)
+            self.add_view(self.appeal_review_view)
             self.persistent_views_added = True
-            print("[INFO] Persistent views registered successfully.")
+            log.info("Persistent views registered successfully.")
+        # Start the background task that writes pending settings changes to disk
+        if not self.settings_flusher.is_running():
+            self.settings_flusher.start()
         # Sync slash commands with Discord
         try:
-            print("[INFO] Attempting to sync application commands...")
+            log.info("Attempting to sync application commands...")
             # Sync commands globally. Can take time to propagate initially.
             synced = await self.tree.sync()
-            print(f"[INFO] Synced {len(synced)} application commands.")
-            # Optional: Log synced command names
-            # if synced: print(f"[DEBUG] Synced commands: {[cmd.name for cmd in synced]}")
+            log.info("Synced %s application commands.", len(synced))
+            if synced: log.debug("Synced commands: %s", [cmd.name for cmd in synced])
         except discord.Forbidden:
-             print("[ERROR] Bot lacks 'applications.commands' scope or permissions to sync slash commands.")
+             log.error("Bot lacks 'applications.commands' scope or permissions to sync slash commands.")
         except Exception as e:
-            print(f"[ERROR] Failed to sync application commands: {e}")
-            traceback.print_exc()
+            log.exception("Failed to sync application commands: %s", e)
 
     async def on_ready(self):
         # Called when the bot is fully connected and ready
-        print(f'[INFO] Logged in as: {self.user} (ID: {self.user.id})')
-        print(f'[INFO] discord.py version: {discord.__version__}')
-        print('[INFO] Bot is ready and online.')
+        log.info("Logged in as: %s (ID: %s)", self.user, self.user.id)
+        log.info("discord.py version: %s", discord.__version__)
+        # A fresh READY (non-resumed reconnect) replaces every Guild object, so drop objects resolved from the old ones
+        self._resolved.clear(); self._overwrite_cache.clear()
+        # Build the open-ticket index from the channels now in cache
+        for guild in self.guilds:
+            self.rebuild_ticket_index(guild)
+        log.info("Indexed %s open tickets across %s guilds.", len(self._ticket_channels), len(self.guilds))
+        log.info('Bot is ready and online.')
         # Set bot presence/activity
         try:
             await self.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name="for tickets"))
-            print("[INFO] Bot presence set successfully.")
+            log.info("Bot presence set successfully.")
         except Exception as e:
-            print(f"[ERROR] Could not set bot presence: {e}")
-        print('------')
+            log.error("Could not set bot presence: %s", e)
+
+    async def on_message(self, message: discord.Message):
+        # Route DM replies to a waiting appeal questionnaire with one dict lookup,
+        # instead of running a wait_for predicate against every message the bot sees
+        for user_id, fut in self._dm_waiters.get(message.channel.id, ()):
+            if message.author.id == user_id and not fut.done(): fut.set_result(message) # Every waiting questionnaire sees the reply, like wait_for
+        await super().on_message(message) # Keep mention-prefix command processing
+
+    async def wait_for_dm_reply(self, channel: discord.abc.Messageable, user: discord.abc.User, timeout: float) -> discord.Message:
+        """Waits for the next message from user in channel. Raises asyncio.TimeoutError."""
+        fut = asyncio.get_running_loop().create_future()
+        waiters = self._dm_waiters.setdefault(channel.id, []); waiter = (user.id, fut); waiters.append(waiter)
+        try: return await asyncio.wait_for(fut, timeout)
+        finally:
+            waiters.remove(waiter)
+            if not waiters and self._dm_waiters.get(channel.id) is waiters: del self._dm_waiters[channel.id]
+
+    def mark_settings_dirty(self):
+        """Schedules the settings to be written by the next flusher run."""
+        self._settings_dirty = True
+
+    async def flush_settings(self):
+        """Writes settings to disk if they changed since the last flush."""
+        async with self._save_lock:
+            if not self._settings_dirty:
+                return
+            self._settings_dirty = False
+            try:
+                # Serialize on the loop so the dict can't change mid-dump, write in a thread
+                payload = serialize_settings(self.settings)
+            except Exception as e:
+                log.exception("Could not serialize settings: %s", e)
+                return
+            if not await asyncio.to_thread(write_settings_file, payload):
+                self._settings_dirty = True # Retry on the next flush
+
+    @tasks.loop(seconds=SETTINGS_FLUSH_INTERVAL)
+    async def settings_flusher(self):
+        await self.flush_settings()
+
+    async def close(self):
+        # Stop the periodic flusher and persist any pending changes before shutting down
+        self.settings_flusher.cancel()
+        try:
+            await self.flush_settings()
+        except Exception as e:
+            log.exception("Final settings flush failed: %s", e)
+        await super().close()
+
+    # --- SCHEDULED CHANNEL DELETION ---
+
+    def schedule_channel_delete(self, channel: discord.abc.GuildChannel, delay: float, reason: str) -> bool:
+        """Deletes a channel after `delay` seconds without keeping the caller waiting. False if one is already pending."""
+        if channel.id in self._pending_deletes:
+            return False
+        self._pending_deletes[channel.id] = asyncio.get_running_loop().call_later(delay, self._start_channel_delete, channel.id, reason)
+        return True
+
+    def _start_channel_delete(self, channel_id: int, reason: str):
+        task = asyncio.create_task(self._delete_channel(channel_id, reason))
+        self._delete_tasks.add(task); task.add_done_callback(self._delete_tasks.discard)
+
+    async def _delete_channel(self, channel_id: int, reason: str):
+        self._pending_deletes.pop(channel_id, None)
+        channel = self.get_channel(channel_id)
+        if channel is None: return # Already deleted by someone else
+        try:
+            await channel.delete(reason=reason)
+            self.remove_from_index(channel_id)
+        except discord.NotFound: pass
+        except discord.Forbidden: log.error("Lacking delete permissions for %s", channel_id)
+        except Exception as e: log.exception("Error deleting channel %s: %s", channel_id, e)
+
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        # Keep the ticket index in sync when a ticket channel is deleted by any means
+        self.remove_from_index(channel.id)
+        self.invalidate_resolved(channel.guild.id, channel.id)
+        _channel_edit_bucket.pop(channel.id, None)
+        if handle := self._pending_deletes.pop(channel.id, None): handle.cancel() # Deleted before the countdown ended
+
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        # Staff can move a ticket out of (or into) the ticket category or edit its topic by hand; keep the index in step
+        if not isinstance(after, discord.TextChannel) or (before.category_id == after.category_id and before.topic == after.topic):
+            return
+        in_category = after.category_id is not None and after.category_id == self.ticket_category_id(after.guild.id)
+        parsed = parse_ticket_topic(after.topic) if in_category else None
+        if not parsed:
+            self.remove_from_index(after.id)
+        elif self._ticket_channels.get(after.id) != (after.guild.id, *parsed):
+            self.add_to_index(after.guild.id, parsed[0], parsed[1], after.id)
+
+    async def on_guild_role_delete(self, role: discord.Role):
+        self.invalidate_resolved(role.guild.id, role.id)
+        self._overwrite_cache.pop(role.guild.id, None) # May reference the deleted role
+
+    async def on_guild_remove(self, guild: discord.Guild):
+        self._resolved.pop(guild.id, None)
+        self._overwrite_cache.pop(guild.id, None)
+
+    # --- PERMISSION OVERWRITE CACHE ---
+
+    def get_ticket_overwrites(self, guild: discord.Guild, staff_role: discord.Role) -> dict:
+        """Returns the guild-wide overwrites for a new ticket (the ticket creator is added by the caller)."""
+        guild_cache = self._overwrite_cache.setdefault(guild.id, {})
+        overwrites = guild_cache.get('ticket')
+        if overwrites is None:
+            overwrites = guild_cache['ticket'] = {guild.default_role: OVERWRITE_HIDDEN, guild.me: OVERWRITE_TICKET_BOT, staff_role: OVERWRITE_TICKET_STAFF}
+        return overwrites
+
+    def get_archive_overwrites(self, guild: discord.Guild) -> dict:
+        """Returns the overwrites applied to a ticket channel when it is archived."""
+        guild_cache = self._overwrite_cache.setdefault(guild.id, {})
+        overwrites = guild_cache.get('archive')
+        if overwrites is None:
+            overwrites = {guild.default_role: OVERWRITE_HIDDEN, guild.me: OVERWRITE_ARCHIVE_BOT}
+            if staff_role := self.get_setting_role(guild, 'staff_role'): overwrites[staff_role] = OVERWRITE_ARCHIVE_STAFF
+            guild_cache['archive'] = overwrites
+        return overwrites
+
+    # --- RESOLVED ROLE/CHANNEL CACHE ---
+
+    def _resolve(self, guild: discord.Guild, key: str, lookup, expected_type):
+        """Returns the object configured under a settings key, cached until the setting or object changes."""
+        guild_cache = self._resolved.setdefault(guild.id, {})
+        obj = guild_cache.get(key)
+        if obj is not None and obj.guild is guild:
+            return obj # Cached objects from a replaced Guild (after a reconnect) are looked up again
+        obj_id = self.get_guild_settings(guild.id).get(key)
+        obj = lookup(obj_id) if obj_id else None
+        if not isinstance(obj, expected_type):
+            return None # Missing or wrong type; not cached so a later fix is picked up
+        guild_cache[key] = obj
+        return obj
+
+    def get_setting_role(self, guild: discord.Guild, key: str):
+        """Resolves a role setting (e.g. 'staff_role') to a discord.Role, or None."""
+        return self._resolve(guild, key, guild.get_role, discord.Role)
+
+    def get_setting_category(self, guild: discord.Guild, key: str):
+        """Resolves a category setting (e.g. 'ticket_category') to a discord.CategoryChannel, or None."""
+        return self._resolve(guild, key, guild.get_channel, discord.CategoryChannel)
+
+    def get_setting_text_channel(self, guild: discord.Guild, key: str):
+        """Resolves a channel setting (e.g. 'appeal_channel') to a discord.TextChannel, or None."""
+        return self._resolve(guild, key, guild.get_channel, discord.TextChannel)
+
+    def invalidate_resolved(self, guild_id: int, object_id: int = None, key: str = None):
+        """Drops cached objects for a guild by settings key and/or by the deleted object's ID."""
+        guild_cache = self._resolved.get(guild_id)
+        if not guild_cache:
+            return
+        if key:
+            guild_cache.pop(key, None)
+        if object_id:
+            for cached_key in [k for k, obj in guild_cache.items() if obj.id == object_id]:
+                del guild_cache[cached_key]
+
+    # --- TICKET INDEX ---
+
+    def rebuild_ticket_index(self, guild: discord.Guild):
+        """Rebuilds the open-ticket index for a guild by scanning its ticket category once."""
+        for channel_id in [cid for cid, entry in self._ticket_channels.items() if entry[0] == guild.id]:
+            self.remove_from_index(channel_id)
+        self.ticket_index[guild.id] = {}
+
+        # Read the raw settings entry: going through get_guild_settings would write defaults for every unconfigured guild
+        category = guild.get_channel(self.ticket_category_id(guild.id) or 0)
+        if not isinstance(category, discord.CategoryChannel):
+            return
+        for channel in category.text_channels:
+            parsed = parse_ticket_topic(channel.topic)
+            if parsed:
+                self.add_to_index(guild.id, parsed[0], parsed[1], channel.id)
+
+    def ticket_category_id(self, guild_id: int):
+        """Returns the configured ticket category ID for a guild without normalizing its settings entry."""
+        raw = self.settings.get(str(guild_id))
+        return raw.get('ticket_category') if isinstance(raw, dict) else None
+
+    def add_to_index(self, guild_id: int, user_id: int, ticket_type: str, channel_id: int):
+        """Records an open ticket channel in the index."""
+        users = self.ticket_index.setdefault(guild_id, {})
+        if channel_id in self._ticket_channels: self.remove_from_index(channel_id) # Re-indexing; don't count it twice
+        users.setdefault(user_id, {}).setdefault(ticket_type, set()).add(channel_id)
+        self._ticket_channels[channel_id] = (guild_id, user_id, ticket_type)
+        self._open_ticket_counts[guild_id] = self._open_ticket_counts.get(guild_id, 0) + 1
+
+    def remove_from_index(self, channel_id: int):
+        """Drops a ticket channel from the index (no-op if it isn't indexed)."""
+        entry = self._ticket_channels.pop(channel_id, None)
+        if not entry:
+            return
+        guild_id, user_id, ticket_type = entry
+        self._open_ticket_counts[guild_id] = max(0, self._open_ticket_counts.get(guild_id, 0) - 1)
+        user_tickets = self.ticket_index.get(guild_id, {}).get(user_id)
+        if not user_tickets:
+            return
+        channels = user_tickets.get(ticket_type)
+        if channels:
+            channels.discard(channel_id)
+            if not channels: del user_tickets[ticket_type]
+        if not user_tickets: del self.ticket_index[guild_id][user_id]
+
+    def count_user_tickets(self, guild_id: int, user_id: int, ticket_type: str = None) -> int:
+        """Counts a user's open tickets in a guild, optionally of a single type."""
+        user_tickets = self.ticket_index.get(guild_id, {}).get(user_id)
+        if not user_tickets:
+            return 0
+        if ticket_type:
+            return len(user_tickets.get(ticket_type, ()))
+        return sum(len(channels) for channels in user_tickets.values())
+
+    def count_open_tickets(self, guild_id: int) -> int:
+        """Returns the number of open tickets in a guild without scanning its channels."""
+        return self._open_ticket_counts.get(guild_id, 0)
+
+    def is_setup_complete(self, guild_id: int) -> bool:
+        """Returns True if every required setting is configured for the guild."""
+        complete = self._setup_complete.get(guild_id)
+        if complete is None:
+            settings = self.get_guild_settings(guild_id)
+            complete = self._setup_complete[guild_id] = all(settings.get(key) for key in REQUIRED_SETTINGS)
+        return complete
 
     def get_guild_settings(self, guild_id: int):
         """Gets settings for a specific guild, ensuring defaults and correct types."""
-        guild_id_str = str(guild_id)
+        # Fast path: this guild's settings were already validated
+        cached = self._guild_cache.get(guild_id)
+        if cached is not None:
+            return cached
 
-        # Ensure self.settings is a dict, reload/reset if necessary
-        if not isinstance(self.settings, dict):
-            print("[CRITICAL WARNING] self.settings is not a dict! Reloading settings...")
-            self.settings = load_settings()
-            if not isinstance(self.settings, dict): # Still not dict? Reset.
-                print("[CRITICAL ERROR] Could not load settings as dict. Resetting all settings!")
-                self.settings = {}
+        guild_id_str = str(guild_id)
+        # self.settings is always a dict: load_settings guarantees it
 
         # Default structure for a guild's settings
         defaults = {
@@ -146,35 +574,47 @@ class TicketBot(commands.Bot):
 
         # If guild settings don't exist or are the wrong type, initialize with defaults
         if not isinstance(guild_settings, dict):
-             print(f"[WARNING] Settings for guild {guild_id_str} are invalid or missing. Initializing with defaults.")
-             guild_settings = defaults.copy() # Use a copy of defaults
+             log.warning("Settings for guild %s are invalid or missing. Initializing with defaults.", guild_id_str)
+             guild_settings = defaults.copy() # Use a copy of defaults (already complete, no merge needed)
              self.settings[guild_id_str] = guild_settings # Add/overwrite in main settings dict
              updated = True # Mark for saving
-
-        # Ensure all default keys exist in the retrieved or newly created guild settings
-        for key, default_value in defaults.items():
-            if key not in guild_settings:
-                # print(f"[DEBUG] Adding missing key '{key}' with default value for guild {guild_id_str}") # Debug log
-                guild_settings[key] = default_value
-                updated = True
-
-        # Save settings only if defaults were added or structure was reset
+        else:
+            # Ensure all default keys exist in the existing guild settings
+            for key, default_value in defaults.items():
+                if key not in guild_settings:
+                    log.debug("Adding missing key '%s' with default value for guild %s", key, guild_id_str)
+                    guild_settings[key] = default_value
+                    updated = True
+
+        # Blacklist keys are user IDs: JSON stores them as strings, keep them as ints in memory
+        blacklist = guild_settings["blacklist"]
+        if not isinstance(blacklist, dict):
+            log.warning("Blacklist for guild %s is invalid. Resetting it.", guild_id_str)
+            guild_settings["blacklist"] = {}; updated = True
+        elif any(isinstance(user_id, str) for user_id in blacklist):
+            guild_settings["blacklist"] = converted = {int(user_id): reason for user_id, reason in blacklist.items() if str(user_id).isascii() and str(user_id).isdecimal()} # isdigit() would accept '²', which int() rejects
+            if len(converted) != len(blacklist):
+                log.warning("Dropped %s invalid blacklist entries for guild %s.", len(blacklist) - len(converted), guild_id_str)
+                updated = True # Rewrite settings.json without them
+
+        # Schedule a single save only if defaults were added or structure was reset
         if updated:
-            save_settings(self.settings)
+            self.mark_settings_dirty()
 
+        self._guild_cache[guild_id] = guild_settings
         return guild_settings # Return the validated guild_settings dictionary
 
     def update_guild_setting(self, guild_id: int, key: str, value):
         """Updates a specific setting for a guild."""
-        # Use get_guild_settings to ensure the guild entry exists and is a dict
+        # get_guild_settings ensures the guild entry exists and is a dict
         settings = self.get_guild_settings(guild_id)
-        # Should always be a dict now, but check again for safety
-        if isinstance(settings, dict):
-            settings[key] = value
-            save_settings(self.settings) # Save the entire settings object
-        else:
-            # This case should ideally not be reached anymore
-            print(f"[CRITICAL ERROR] Cannot update setting '{key}' for guild {guild_id}. Settings structure invalid.")
+        settings[key] = value
+        self.invalidate_resolved(guild_id, key=key) # Setting may point at a new role/channel
+        if key in REQUIRED_SETTINGS:
+            self._setup_complete.pop(guild_id, None) # Recomputed on next check
+        if key == 'staff_role':
+            self._overwrite_cache.pop(guild_id, None) # Overwrites are keyed on the staff role
+        self.mark_settings_dirty() # Written by the background flusher
 
 
 # Initialize the Bot instance
@@ -184,27 +624,32 @@ bot = TicketBot()
 
 # --- HELPER FUNCTIONS ---
 
-def create_embed(title: str = None, description: str = None, color: discord.Color = discord.Color.blurple()) -> discord.Embed:
+def create_embed(title: str = None, description: str = None, color: discord.Color = COLOR_BLURPLE) -> discord.Embed:
     """Helper function to create a standard embed, handles None values."""
-    # Use None as default, pass discord.Embed.Empty *only* if the value is actually None
-    final_title = title if title is not None else discord.Embed.Empty
-    final_description = str(description) if description is not None else discord.Embed.Empty # Ensure description is string or Empty
-
-    # Add basic length check for description to avoid errors
-    if len(final_description) > 4096: # Discord embed description limit
-        print(f"Warning: Truncating embed description starting with: {final_description[:50]}...")
-        final_description = final_description[:4093] + "..."
-
-    return discord.Embed(title=final_title, description=final_description, color=color)
+    # Build the payload directly and let Embed.from_dict skip the per-kwarg setters; None fields are simply omitted
+    data = {"type": "rich"}
+    if title is not None: data["title"] = title
+    if description is not None:
+        description = str(description)
+        # Add basic length check for description to avoid errors
+        if len(description) > 4096: # Discord embed description limit
+            log.warning("Truncating embed description starting with: %s...", description[:50])
+            description = description[:4093] + "..."
+        data["description"] = description
+    if color is not None: data["color"] = color.value if isinstance(color, discord.Colour) else int(color)
+    return discord.Embed.from_dict(data)
 
 # ... (The async def send_embed_response function follows) ...
 
 # --- HELPER FUNCTIONS CONTINUED --- # (Make sure create_embed is correct above this)
 
-async def send_embed_response(interaction: discord.Interaction, title: str = None, description: str = None, color: discord.Color = discord.Color.blurple(), ephemeral: bool = True):
+async def send_embed_response(interaction: discord.Interaction, title: str = None, description: str = None, color: discord.Color = COLOR_BLURPLE, ephemeral: bool = True):
     """Sends embed responses specifically for interactions, handles None values."""
     # Create embed using the helper function which handles None correctly
-    embed = create_embed(title, description, color)
+    await send_embed(interaction, create_embed(title, description, color), ephemeral)
+
+async def send_embed(interaction: discord.Interaction, embed: discord.Embed, ephemeral: bool = True):
+    """Sends an already-built embed (e.g. one of the static embeds below) as an interaction response."""
     try:
         # Use defer() first if lengthy operation might follow, otherwise send directly
         # For simplicity, we just try to send/followup
@@ -213,12 +658,23 @@ async def send_embed_response(interaction: discord.Interaction, title: str = Non
         else:
             await interaction.response.send_message(embed=embed, ephemeral=ephemeral)
     except discord.NotFound:
-         print(f"[WARNING] Interaction not found sending '{title}'.")
+         log.warning("Interaction not found sending '%s'.", embed.title)
     except discord.Forbidden:
-         print(f"[ERROR] Bot lacks permissions for embed response in {interaction.channel_id}.")
+         log.error("Bot lacks permissions for embed response in %s.", interaction.channel_id)
     except Exception as e:
-        print(f"[ERROR] sending embed response: {type(e).__name__} - {e}")
-        traceback.print_exc()
+        log.exception("Error sending embed response: %s - %s", type(e).__name__, e)
+
+# --- STATIC EMBEDS ---
+# Fixed responses sent on hot check/error paths, built once at import and reused
+# (sending an embed does not modify it)
+EMBED_NOT_IN_GUILD = create_embed("Error", "This command must be used in a server.", COLOR_RED)
+EMBED_CANNOT_VERIFY = create_embed("Error", "Could not verify permissions.", COLOR_RED)
+EMBED_BLACKLISTED = create_embed("Action Denied", "You are currently blacklisted and cannot create new tickets.", COLOR_RED)
+EMBED_STAFF_ONLY = create_embed("Permission Denied", "This command is reserved for staff members only.", COLOR_RED)
+EMBED_NOT_TICKET_CHANNEL = create_embed("Invalid Channel", "This command can only be used within an open ticket channel.", COLOR_RED)
+EMBED_CHECK_FAILED = create_embed("Check Failed", "You do not meet the requirements for this command.", COLOR_ORANGE)
+EMBED_STAFF_ROLE_NOT_SET = create_embed("Setup Error", "Staff role not configured.", COLOR_RED)
+EMBED_APPEAL_STAFF_ONLY = create_embed("Permission Denied", "Only staff members can review appeals.", COLOR_RED)
 
 # ... (rest of the code follows)
 
@@ -234,104 +690,104 @@ async def on_app_command_error(interaction: discord.Interaction, error: app_comm
     if isinstance(error, app_commands.errors.MissingPermissions):
         error_title = "Permission Denied"
         error_message = "You lack the required permissions to use this command."
-        print(f"{log_message}: MissingPermissions - {error.missing_permissions}")
+        log.warning("%s: MissingPermissions - %s", log_message, error.missing_permissions)
     elif isinstance(error, app_commands.errors.CheckFailure):
         # Custom checks (like is_staff_check) usually send their own response.
         # Log that the check failed, but typically don't send another message.
-        print(f"{log_message}: CheckFailure (likely handled by check decorator).")
+        log.info("%s: CheckFailure (likely handled by check decorator).", log_message)
         # If the interaction is somehow not responded to, send a generic check fail message
         if not interaction.response.is_done():
              # This indicates an issue with the check decorator not responding properly
-             print("[WARNING] CheckFailure occurred but interaction was not responded to by check decorator.")
-             await send_embed_response(interaction, "Check Failed", "You do not meet the requirements for this command.", discord.Color.orange())
+             log.warning("CheckFailure occurred but interaction was not responded to by check decorator.")
+             await send_embed(interaction, EMBED_CHECK_FAILED)
         return # Prevent further processing
     elif isinstance(error, app_commands.CommandNotFound):
          # Should not happen with synced commands, but good to handle
          error_title = "Command Not Found"
          error_message = "This command seems to be invalid or is no longer available."
-         print(f"{log_message}: CommandNotFound")
+         log.warning("%s: CommandNotFound", log_message)
     elif isinstance(original_error, discord.Forbidden):
         # Permissions error *during* command execution (e.g., cannot send message, manage roles)
         error_title = "Permissions Error"
         missing_perms_str = f"Missing: `{', '.join(original_error.missing_perms)}`" if hasattr(original_error, 'missing_perms') else ""
         error_message = f"I lack the necessary permissions to complete this action. {missing_perms_str}"
-        print(f"{log_message}: Forbidden - {original_error.text}. {missing_perms_str}")
+        log.error("%s: Forbidden - %s. %s", log_message, original_error.text, missing_perms_str)
     elif isinstance(error, app_commands.errors.CommandInvokeError):
         # Generic error within the command code itself
         error_title = "Command Execution Error"
         error_message = "An internal error occurred while executing this command. The issue has been logged."
-        print(f"{log_message}: CommandInvokeError - Original error below:")
-        traceback.print_exception(type(original_error), original_error, original_error.__traceback__)
+        log.error("%s: CommandInvokeError", log_message, exc_info=original_error)
     else:
         # Log other unexpected slash command errors
         error_title = "Unexpected Error"
-        print(f"{log_message}: UNHANDLED SLASH COMMAND ERROR ({type(error)}): {error}")
-        traceback.print_exception(type(error), error, error.__traceback__)
+        log.error("%s: UNHANDLED SLASH COMMAND ERROR (%s): %s", log_message, type(error), error, exc_info=error)
 
     # Attempt to send the error message ephemerally
     try:
-        await send_embed_response(interaction, error_title, error_message, discord.Color.red(), ephemeral=True)
+        await send_embed_response(interaction, error_title, error_message, COLOR_RED, ephemeral=True)
     except Exception as e:
-        print(f"Failed to send error message via interaction: {e}")
+        log.error("Failed to send error message via interaction: %s", e)
 
 # End of Part 1/5
 # bot.py (Part 2/5)
 
 # --- HELPER FUNCTIONS CONTINUED ---
+@functools.lru_cache(maxsize=None) # Content depends only on which REQUIRED_SETTINGS are missing (at most 2**4 variants)
+def build_setup_embed(missing: tuple) -> discord.Embed:
+    """Builds the 'not configured' embed listing the /setup commands for the missing settings."""
+    embed = create_embed("Bot Not Fully Configured", "An administrator must configure the following settings using `/setup` commands before the bot can function correctly:", COLOR_RED)
+    # List missing settings more clearly
+    embed.add_field(name="Required Settings Missing", value="\n".join(f"- `/setup {key}`" for key in missing), inline=False)
+    return embed
+
+def interaction_settings(interaction: discord.Interaction) -> dict:
+    """Guild settings for an interaction, fetched once and reused by its checks and callback via interaction.extras."""
+    settings = interaction.extras.get('guild_settings')
+    if settings is None:
+        settings = interaction.extras['guild_settings'] = bot.get_guild_settings(interaction.guild_id)
+    return settings
+
 async def check_setup(interaction: discord.Interaction) -> bool:
     """Checks if the bot is fully set up for the guild via slash command context."""
     guild_id = interaction.guild_id
     if not guild_id:
-        await send_embed_response(interaction, "Error", "This command must be used in a server.", discord.Color.red())
+        await send_embed(interaction, EMBED_NOT_IN_GUILD)
         return False # Cannot check setup outside a guild
 
+    # Fast path: precomputed flag, no per-key lookups
+    if bot.is_setup_complete(guild_id):
+        return True
+
     try:
-        settings = bot.get_guild_settings(guild_id) # Fetch settings for the guild
+        settings = interaction_settings(interaction) # Fetch settings for the guild
     except Exception as e:
-         print(f"[ERROR] Failed to get guild settings during setup check for guild {guild_id}: {e}")
-         await send_embed_response(interaction, "Critical Error", "Could not load server configuration.", discord.Color.red())
+         log.error("Failed to get guild settings during setup check for guild %s: %s", guild_id, e)
+         await send_embed_response(interaction, "Critical Error", "Could not load server configuration.", COLOR_RED)
          return False # Cannot proceed without settings
 
-    required_settings = ['panel_channel', 'ticket_category', 'archive_category', 'staff_role']
-    # Check if the values for required keys are actually set (not None)
-    missing = [s.replace("_", " ").title() for s in required_settings if not settings.get(s)]
+    # Work out which required keys are not set (not None)
+    missing = tuple(key for key in REQUIRED_SETTINGS if not settings.get(key))
 
     if missing:
-        embed = discord.Embed(
-            title="Bot Not Fully Configured",
-            description="An administrator must configure the following settings using `/setup` commands before the bot can function correctly:",
-            color=discord.Color.red()
-        )
-        # List missing settings more clearly
-        missing_commands = [f"- `/setup {s.lower().replace(' ', '_')}`" for s in missing]
-        embed.add_field(name="Required Settings Missing", value="\n".join(missing_commands), inline=False)
-        await send_embed_response(interaction, embed.title, embed.description, embed.color, ephemeral=True)
+        # Send the full embed (with the field listing the missing commands)
+        await send_embed(interaction, build_setup_embed(missing), ephemeral=True)
         return False
     return True # All required settings are present
 
+# Helper to check staff membership without materializing member.roles
+def is_staff_member(member: discord.Member, staff_role_id: int = None) -> bool:
+    """True if the member has the staff role or is an administrator."""
+    # Member.get_role is a binary search over the member's role IDs, whereas
+    # `role in member.roles` builds and sorts a list of Role objects first.
+    # Checked before administrator, which has to fold every role's permissions.
+    if staff_role_id and member.get_role(staff_role_id) is not None:
+        return True
+    return member.guild_permissions.administrator
+
 # Helper to count a user's open tickets of a specific type
-def count_user_tickets(guild: discord.Guild, user_id: int, category_id: int, ticket_type: str = None) -> int:
-    """Counts open tickets for a user within a specific category, optionally filtering by type stored in topic."""
-    category = guild.get_channel(category_id)
-    # Ensure the category exists and is actually a category channel
-    if not category or not isinstance(category, discord.CategoryChannel):
-        print(f"[WARNING] Invalid category ID {category_id} provided for counting tickets in guild {guild.id}.")
-        return 0 # Cannot count tickets if category is invalid
-
-    count = 0
-    user_id_str = str(user_id)
-    # Iterate only through text channels within the specified category
-    for channel in category.text_channels:
-        # Check if channel topic exists and contains the user ID marker
-        if channel.topic and f"ticket-user-{user_id_str}" in channel.topic:
-            # If a specific type is requested, check for the type marker as well
-            if ticket_type:
-                if f"type-{ticket_type}" in channel.topic:
-                    count += 1
-            else:
-                # If no type specified, count all tickets matching the user ID marker
-                count += 1
-    return count
+def count_user_tickets(guild: discord.Guild, user_id: int, ticket_type: str = None) -> int:
+    """Counts open tickets for a user, optionally filtering by type, using the bot's ticket index."""
+    return bot.count_user_tickets(guild.id, user_id, ticket_type)
 
 # Helper function to create a new ticket channel
 async def create_ticket_channel(interaction: discord.Interaction, ticket_type_name: str, settings: dict):
@@ -339,20 +795,16 @@ async def create_ticket_channel(interaction: discord.Interaction, ticket_type_na
     guild = interaction.guild
     user = interaction.user # The user who initiated the interaction
 
-    # Validate essential settings retrieved from the dictionary
-    staff_role_id = settings.get('staff_role')
-    category_id = settings.get('ticket_category')
-
-    # Fetch role and category objects, handling potential errors
-    staff_role = guild.get_role(staff_role_id) if staff_role_id else None
-    category = guild.get_channel(category_id) if category_id else None
+    # Fetch role and category objects from settings, handling potential errors
+    staff_role = bot.get_setting_role(guild, 'staff_role')
+    category = bot.get_setting_category(guild, 'ticket_category')
 
     # Error checking for configuration
     if not staff_role:
-        await send_embed_response(interaction, "Configuration Error", "The Staff Role specified in settings is invalid or not found.", discord.Color.red(), ephemeral=True)
+        await send_embed_response(interaction, "Configuration Error", "The Staff Role specified in settings is invalid or not found.", COLOR_RED, ephemeral=True)
         return None, None # Return None tuple on failure
-    if not category or not isinstance(category, discord.CategoryChannel):
-        await send_embed_response(interaction, "Configuration Error", "The Ticket Category specified in settings is invalid or not found.", discord.Color.red(), ephemeral=True)
+    if not category:
+        await send_embed_response(interaction, "Configuration Error", "The Ticket Category specified in settings is invalid or not found.", COLOR_RED, ephemeral=True)
         return None, None
 
     # Retrieve and increment ticket counter
@@ -360,23 +812,20 @@ async def create_ticket_channel(interaction: discord.Interaction, ticket_type_na
     bot.update_guild_setting(guild.id, "ticket_counter", ticket_num + 1) # Update counter in settings
 
     # Define channel permission overwrites
-    overwrites = {
-        guild.default_role: discord.PermissionOverwrite(view_channel=False), # Hide from @everyone
-        user: discord.PermissionOverwrite(view_channel=True, read_messages=True, send_messages=True, attach_files=True, embed_links=True), # Allow user basic perms
-        guild.me: discord.PermissionOverwrite(view_channel=True, read_messages=True, send_messages=True, embed_links=True, attach_files=True, manage_channels=True, manage_permissions=True, manage_messages=True), # Bot needs extensive perms
-        staff_role: discord.PermissionOverwrite(view_channel=True, read_messages=True, send_messages=True, manage_messages=True, attach_files=True, embed_links=True) # Allow staff necessary perms
-    }
+    # Copy the cached guild-wide overwrites so the creator can be added for this channel only
+    overwrites = dict(bot.get_ticket_overwrites(guild, staff_role))
+    overwrites[user] = OVERWRITE_TICKET_USER
 
     try:
         # Sanitize username for channel name (use display_name for better readability)
-        safe_user_name = "".join(c for c in user.display_name if c.isalnum() or c in ('-', '_')).lower() or "user"
+        safe_user_name = user.display_name.translate(TICKET_NAME_TABLE).lower() or "user"
         # Ensure channel name is within Discord limits (100 chars)
         channel_name = f"{ticket_type_name}-{ticket_num}-{safe_user_name}"[:100]
         # Create a descriptive topic including user ID and type markers for identification
         # Ensure topic length is within Discord limits (1024 chars)
         topic = f"Ticket #{ticket_num} ({ticket_type_name.capitalize()}) for {user.name} ({user.id}). UserID marker: [ticket-user-{user.id} type-{ticket_type_name}]"[:1024]
 
-        print(f"[INFO] Attempting to create channel '{channel_name}' in category '{category.name}' ({category.id}) for user {user.id}")
+        log.info("Attempting to create channel '%s' in category '%s' (%s) for user %s", channel_name, category.name, category.id, user.id)
         # Create the channel with specified settings
         new_channel = await category.create_text_channel(
             name=channel_name,
@@ -384,68 +833,90 @@ async def create_ticket_channel(interaction: discord.Interaction, ticket_type_na
             topic=topic,
             reason=f"Ticket created via bot by {user.name} ({user.id})" # Audit log reason
         )
-        print(f"[INFO] Channel created successfully: {new_channel.mention} ({new_channel.id})")
+        log.info("Channel created successfully: %s (%s)", new_channel.mention, new_channel.id)
+        bot.add_to_index(guild.id, user.id, ticket_type_name, new_channel.id)
         return new_channel, staff_role # Return channel and role object on success
 
     except discord.Forbidden:
         # Specific error if bot lacks permissions
-        print(f"[ERROR] Bot lacks permissions to create channel or set permissions in category {category.id}")
-        await send_embed_response(interaction, "Permissions Error", "I lack the required permissions to create a ticket channel or set its permissions within the designated category.", discord.Color.red(), ephemeral=True)
+        log.error("Bot lacks permissions to create channel or set permissions in category %s", category.id)
+        await send_embed_response(interaction, "Permissions Error", "I lack the required permissions to create a ticket channel or set its permissions within the designated category.", COLOR_RED, ephemeral=True)
         return None, None
     except Exception as e:
         # Catch any other unexpected errors during channel creation
-        print(f"[ERROR] Failed to create ticket channel: {e}")
-        traceback.print_exc()
-        await send_embed_response(interaction, "Error", "An unexpected error occurred while trying to create the ticket channel.", discord.Color.red(), ephemeral=True)
+        log.exception("Failed to create ticket channel: %s", e)
+        await send_embed_response(interaction, "Error", "An unexpected error occurred while trying to create the ticket channel.", COLOR_RED, ephemeral=True)
         return None, None
 
 # Helper function to generate a transcript file content
+# Safe maximum transcript size for Discord's file upload limit (7.5MB)
+TRANSCRIPT_MAX_SIZE = 7 * 1024 * 1024 + 512 * 1024
+TRANSCRIPT_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S UTC'
+TRANSCRIPT_TRUNCATED_NOTICE = b"\n\n--- TRANSCRIPT TRUNCATED DUE TO DISCORD FILE SIZE LIMIT ---"
+
 async def generate_transcript(channel: discord.TextChannel):
     """Generates transcript content as bytes, handling size limits."""
-    messages = []
+    # Lines are encoded and written as messages stream in, so the full transcript
+    # never exists as a list of strings or one giant str
+    buf = io.BytesIO()
+    size_limit = TRANSCRIPT_MAX_SIZE - 200 # Leave room for the truncation notice
+    written = 0; truncated = False
+    # Bind helpers to locals once; they are used for every message below
+    remove_markdown = discord.utils.remove_markdown; escape_mentions = discord.utils.escape_mentions
+    write = buf.write
     # Iterate through all messages in the channel history, oldest first
+    # (discord.py already pages this at the API maximum of 100 messages per request)
     async for msg in channel.history(limit=None, oldest_first=True):
-        timestamp = msg.created_at.strftime('%Y-%m-%d %H:%M:%S UTC') # Consistent UTC timestamp
-        # Clean content: remove markdown, escape mentions
-        clean_content = discord.utils.remove_markdown(discord.utils.escape_mentions(msg.content))
-        author_display = f"{msg.author.display_name} ({msg.author.id})" # Include display name and ID
-        # Add non-bot messages to the transcript list
-        if not msg.author.bot:
-            messages.append(f"[{timestamp}] {author_display}: {clean_content}")
+        author = msg.author; attachments = msg.attachments
+        # Bot messages only contribute their attachments; skip them outright if there are none
+        if author.bot and not attachments:
+            continue
+        timestamp = msg.created_at.strftime(TRANSCRIPT_TIMESTAMP_FORMAT) # Consistent UTC timestamp
+        author_display = f"{author.display_name} ({author.id})" # Include display name and ID
+        lines = []
+        # Add non-bot messages to the transcript
+        if not author.bot:
+            # Clean content: remove markdown, escape mentions
+            clean_content = remove_markdown(escape_mentions(msg.content))
+            lines.append(f"[{timestamp}] {author_display}: {clean_content}")
         # Include attachment URLs in the transcript
-        if msg.attachments:
-            for att in msg.attachments:
-                messages.append(f"[{timestamp}] [Attachment from {author_display}: {att.url}]")
-
-    # Join messages into a single string
-    transcript_content = "\n".join(messages)
-    if not transcript_content:
-        transcript_content = "No messages were sent in this ticket."
-
-    # Encode to check size and handle potential truncation for Discord's file limit
-    encoded_content = transcript_content.encode('utf-8')
-    # Set a safe maximum size (e.g., 7.5MB)
-    max_size = 7 * 1024 * 1024 + 512 * 1024
-
-    if len(encoded_content) > max_size:
-        print(f"[WARNING] Transcript for channel {channel.name} ({channel.id}) is too large ({len(encoded_content)} bytes), truncating.")
-        # Truncate bytes, leaving room for a truncation notice
-        truncated_content = encoded_content[:max_size - 200]
-        try:
-            # Attempt to decode back to string, ignoring potential mid-character cuts
-            transcript_content = truncated_content.decode('utf-8', errors='ignore')
-            transcript_content += "\n\n--- TRANSCRIPT TRUNCATED DUE TO DISCORD FILE SIZE LIMIT ---"
-            encoded_content = transcript_content.encode('utf-8') # Re-encode truncated content
-        except Exception as e:
-             print(f"[ERROR] Error during transcript truncation for channel {channel.id}: {e}")
-             # Provide a fallback error message if truncation fails
-             return io.BytesIO(b"Transcript file was too large and could not be properly truncated.")
-
-    # Return the encoded content within a BytesIO buffer, ready for file sending
-    return io.BytesIO(encoded_content)
+        if attachments:
+            for att in attachments:
+                lines.append(f"[{timestamp}] [Attachment from {author_display}: {att.url}]")
+
+        chunk = ("\n" if written else "") + "\n".join(lines)
+        encoded = chunk.encode('utf-8')
+        if written + len(encoded) > size_limit:
+            # Keep what fits, cutting back to a whole UTF-8 character, then stop reading history
+            cut = size_limit - written
+            while cut and encoded[cut] & 0xC0 == 0x80: cut -= 1 # Continuation byte; back up to the character's lead byte
+            encoded = encoded[:cut]
+            write(encoded); written += len(encoded)
+            truncated = True
+            break
+        write(encoded); written += len(encoded)
+
+    if truncated:
+        log.warning("Transcript for channel %s (%s) exceeded %s bytes, truncating.", channel.name, channel.id, TRANSCRIPT_MAX_SIZE)
+        buf.write(TRANSCRIPT_TRUNCATED_NOTICE)
+    elif not written:
+        buf.write(b"No messages were sent in this ticket.")
+
+    # Return the buffer rewound and ready for file sending
+    buf.seek(0)
+    return buf
 
 # --- APPEAL/MODAL CLASSES ---
 
+async def delete_appeal_messages(bot_user: discord.ClientUser, messages: list, context: str):
+    """Deletes the bot's own messages from an appeal DM concurrently."""
+    # DMs have no bulk-delete endpoint, and a bot can't delete the user's DM messages (always 403), so skip those
+    own_messages = [msg for msg in messages if msg.author.id == bot_user.id]
+    results = await asyncio.gather(*(msg.delete() for msg in own_messages), return_exceptions=True)
+    for msg, result in zip(own_messages, results):
+        if isinstance(result, Exception) and not isinstance(result, (discord.NotFound, discord.Forbidden)): # Ignore if gone/no perms
+            log.warning("Error deleting %s message %s: %s", context, msg.id, result)
+
 # --- Modal for Appeal Approve/Reject Reason ---
 class AppealReasonModal(discord.ui.Modal):
     """Modal popup for staff to enter reason for approving/rejecting an appeal."""
@@ -464,45 +935,44 @@ class AppealReasonModal(discord.ui.Modal):
         """Processes the reason, updates appeal, notifies user."""
         await interaction.response.defer(ephemeral=True); staff_member = interaction.user; reason = self.reason_input.value
         try: appealing_user = await self.bot.fetch_user(self.appealing_user_id)
-        except discord.NotFound: await interaction.followup.send(embed=create_embed("Error", "Could not find the appealing user to notify.", discord.Color.red())); return
+        except discord.NotFound: await interaction.followup.send(embed=create_embed("Error", "Could not find the appealing user to notify.", COLOR_RED)); return
 
         if not self.original_message or not self.original_message.embeds:
-            await interaction.followup.send(embed=create_embed("Error", "Could not find the original appeal message embed.", discord.Color.red())); return
+            await interaction.followup.send(embed=create_embed("Error", "Could not find the original appeal message embed.", COLOR_RED)); return
         original_embed = self.original_message.embeds[0]; new_embed = original_embed.copy()
 
         if self.action == "Approve":
-            title = "✅ Blacklist Appeal Approved"; color = discord.Color.green()
+            title = "✅ Blacklist Appeal Approved"; color = COLOR_GREEN
             dm_desc = f"Your blacklist appeal for **{self.guild.name}** has been approved by staff.\n\n**Reason Provided:**\n```{reason}```\nYou should now be able to create tickets again."
-            settings = self.bot.get_guild_settings(self.guild.id); user_id_str = str(self.appealing_user_id)
-            if user_id_str in settings.get("blacklist", {}):
-                current_blacklist = settings["blacklist"] # Get the dict
-                del current_blacklist[user_id_str] # Remove the user
-                self.bot.update_guild_setting(self.guild.id, "blacklist", current_blacklist) # Save the modified dict
-                print(f"[INFO] User {user_id_str} unblacklisted via appeal by {staff_member.name}.")
+            settings = self.bot.get_guild_settings(self.guild.id)
+            if self.appealing_user_id in settings["blacklist"]:
+                del settings["blacklist"][self.appealing_user_id] # Remove the user
+                self.bot.mark_settings_dirty() # Dict was modified in place; just schedule a save
+                log.info("User %s unblacklisted via appeal by %s.", self.appealing_user_id, staff_member.name)
         else: # Reject
-            title = "❌ Blacklist Appeal Rejected"; color = discord.Color.red()
+            title = "❌ Blacklist Appeal Rejected"; color = COLOR_RED
             dm_desc = f"Your blacklist appeal for **{self.guild.name}** has been rejected by staff.\n\n**Reason Provided:**\n```{reason}```"
 
         try:
             dm_embed = create_embed(title, dm_desc, color); await appealing_user.send(embed=dm_embed)
-        except discord.Forbidden: print(f"[WARNING] Could not DM user {appealing_user.id} (appeal {self.action.lower()}d - DMs disabled)")
-        except Exception as e: print(f"[ERROR] Sending appeal result DM to {appealing_user.id}: {e}")
+        except discord.Forbidden: log.warning("Could not DM user %s (appeal %sd - DMs disabled)", appealing_user.id, self.action.lower())
+        except Exception as e: log.error("Sending appeal result DM to %s: %s", appealing_user.id, e)
 
         new_embed.title = f"[{self.action.upper()}D by {staff_member.name}] Blacklist Appeal"
         new_embed.color = color
         new_embed.add_field(name=f"{self.action.capitalize()}d by {staff_member.display_name}", value=f"```{reason}```", inline=False)
         try: await self.original_message.edit(embed=new_embed, view=None) # Remove buttons
-        except discord.NotFound: print("[WARNING] Original appeal message not found during edit.")
-        except discord.Forbidden: print("[ERROR] Lacking permissions to edit original appeal message.")
+        except discord.NotFound: log.warning("Original appeal message not found during edit.")
+        except discord.Forbidden: log.error("Lacking permissions to edit original appeal message.")
 
         await interaction.followup.send(embed=create_embed("Action Complete", f"The appeal has been **{self.action.lower()}d**. User notified (if DMs enabled).", color), ephemeral=True)
 
     async def on_error(self, interaction: discord.Interaction, error: Exception):
-        print(f"[ERROR] In AppealReasonModal: {error}"); traceback.print_exc()
+        log.error("In AppealReasonModal: %s", error, exc_info=error)
         try:
             response_target = interaction.followup if interaction.response.is_done() else interaction.response
             await response_target.send("An error occurred processing the reason.", ephemeral=True)
-        except Exception as e: print(f"[ERROR] Sending on_error message in AppealReasonModal: {e}")
+        except Exception as e: log.error("Sending on_error message in AppealReasonModal: %s", e)
 
 # --- Persistent View for Appeal Review Buttons in Staff Channel ---
 class AppealReviewView(discord.ui.View):
@@ -514,35 +984,29 @@ class AppealReviewView(discord.ui.View):
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         # Permission check: Only staff can use these buttons
         if not self.bot: self.bot = interaction.client # Fetch bot instance if missing
-        if not self.bot: print("[CRITICAL ERROR] Bot instance missing in AppealReviewView."); return False # Need bot instance
+        if not self.bot: log.critical("Bot instance missing in AppealReviewView."); return False # Need bot instance
 
-        settings = self.bot.get_guild_settings(interaction.guild.id); staff_role_id = settings.get('staff_role')
-        if not staff_role_id: await send_embed_response(interaction, "Setup Error", "Staff role not configured.", discord.Color.red()); return False
-        staff_role = interaction.guild.get_role(staff_role_id)
-        if not isinstance(interaction.user, discord.Member): await send_embed_response(interaction, "Error", "Could not verify permissions.", discord.Color.red()); return False
-        is_admin = interaction.user.guild_permissions.administrator
-        if (staff_role and staff_role in interaction.user.roles) or is_admin: return True
-        else: await send_embed_response(interaction, "Permission Denied", "Only staff members can review appeals.", discord.Color.red()); return False
+        settings = self.bot.get_guild_settings(interaction.guild.id)
+        if not settings.get('staff_role'): await send_embed(interaction, EMBED_STAFF_ROLE_NOT_SET); return False
+        if not isinstance(interaction.user, discord.Member): await send_embed(interaction, EMBED_CANNOT_VERIFY); return False
+        if is_staff_member(interaction.user, settings['staff_role']): return True
+        else: await send_embed(interaction, EMBED_APPEAL_STAFF_ONLY); return False
+
+    async def open_reason_modal(self, interaction: discord.Interaction, action: str):
+        """Shared Approve/Reject handler: finds the appealing user and asks staff for a reason."""
+        if not interaction.message.embeds: await send_embed_response(interaction, "Error", "Cannot find appeal info.", COLOR_RED); return
+        footer_text = interaction.message.embeds[0].footer.text or ""
+        if not (match := APPEAL_USER_ID_RE.search(footer_text)): await send_embed_response(interaction, "Error", "Cannot identify user.", COLOR_RED); return
+        modal = AppealReasonModal(bot_instance=self.bot, action=action, original_message=interaction.message, guild=interaction.guild, appealing_user_id=int(match.group(1)))
+        await interaction.response.send_modal(modal)
 
     @discord.ui.button(label="Approve Appeal", style=discord.ButtonStyle.success, emoji="✅", custom_id="persistent_appeal:approve")
     async def approve(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if not interaction.message.embeds: await send_embed_response(interaction, "Error", "Cannot find appeal info.", discord.Color.red()); return
-        embed = interaction.message.embeds[0]
-        if not embed.footer or "User ID:" not in embed.footer.text: await send_embed_response(interaction, "Error", "Cannot identify user.", discord.Color.red()); return
-        try: user_id = int(embed.footer.text.split(": ")[1])
-        except (IndexError, ValueError): await send_embed_response(interaction, "Error", "Cannot parse User ID.", discord.Color.red()); return
-        modal = AppealReasonModal(bot_instance=self.bot, action="Approve", original_message=interaction.message, guild=interaction.guild, appealing_user_id=user_id)
-        await interaction.response.send_modal(modal)
+        await self.open_reason_modal(interaction, "Approve")
 
     @discord.ui.button(label="Reject Appeal", style=discord.ButtonStyle.danger, emoji="❌", custom_id="persistent_appeal:reject")
     async def reject(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if not interaction.message.embeds: await send_embed_response(interaction, "Error", "Cannot find appeal info.", discord.Color.red()); return
-        embed = interaction.message.embeds[0]
-        if not embed.footer or "User ID:" not in embed.footer.text: await send_embed_response(interaction, "Error", "Cannot identify user.", discord.Color.red()); return
-        try: user_id = int(embed.footer.text.split(": ")[1])
-        except (IndexError, ValueError): await send_embed_response(interaction, "Error", "Cannot parse User ID.", discord.Color.red()); return
-        modal = AppealReasonModal(bot_instance=self.bot, action="Reject", original_message=interaction.message, guild=interaction.guild, appealing_user_id=user_id)
-        await interaction.response.send_modal(modal)
+        await self.open_reason_modal(interaction, "Reject")
 
 # End of Part 2/5
 # bot.py (Part 3/5 - Corrected)
@@ -557,71 +1021,70 @@ class ConfirmAppealView(discord.ui.View):
     async def cleanup(self, interaction: discord.Interaction = None):
         """Stops the view and deletes all tracked messages in the DM."""
         self.stop()
-        # print(f"[DEBUG] Cleaning up {len(self.messages_to_delete)} messages from appeal DM.") # Debug log
-        for msg in reversed(self.messages_to_delete): # Delete in reverse
-            try: await msg.delete()
-            except (discord.NotFound, discord.Forbidden): pass # Ignore if gone/no perms
-            except Exception as e: print(f"[WARNING] Error deleting appeal message {msg.id}: {e}")
-        try:
-            # Delete the final confirmation message itself
-            target_message = interaction.message if interaction else self.message
-            if target_message: await target_message.delete()
-        except (discord.NotFound, discord.Forbidden): pass
-        except Exception as e: print(f"[WARNING] Error cleaning up final appeal confirmation message: {e}")
+        log.debug("Cleaning up %s messages from appeal DM.", len(self.messages_to_delete))
+        # The final confirmation message goes in the same concurrent batch as the tracked messages
+        target_message = interaction.message if interaction else self.message
+        await delete_appeal_messages(self.bot.user, self.messages_to_delete + ([target_message] if target_message else []), "appeal")
 
     @discord.ui.button(label="Submit Appeal", style=discord.ButtonStyle.success, emoji="✅")
     async def submit(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.defer(ephemeral=True) # Defer ephemerally while sending to staff
-        embed = create_embed("New Blacklist Appeal Received", f"**User:** {interaction.user.mention} (`{interaction.user.id}`)\n**Server:** {self.guild.name}", discord.Color.gold())
+        embed = create_embed("New Blacklist Appeal Received", f"**User:** {interaction.user.mention} (`{interaction.user.id}`)\n**Server:** {self.guild.name}", COLOR_GOLD)
         # Use .get() with default for safety when accessing answers
         embed.add_field(name="1. Reason for appeal (Why unfair?)", value=f"```{self.answers.get('q1','Not Provided')}```", inline=False)
         embed.add_field(name="2. Justification for unblacklist", value=f"```{self.answers.get('q2','Not Provided')}```", inline=False)
         embed.add_field(name="3. Supporting Proof/Statement", value=self.answers.get('proof','N/A'), inline=False)
         embed.set_footer(text=f"User ID: {interaction.user.id}") # For review buttons
-        # Pass bot instance to the persistent review view
-        view_to_send = AppealReviewView(bot_instance=self.bot)
+        # Reuse the bot's shared persistent review view
+        view_to_send = self.bot.appeal_review_view
 
         try:
             await self.appeal_channel.send(embed=embed, view=view_to_send) # Send to staff channel
         except discord.Forbidden:
-             print(f"[ERROR] Bot lacks permission to send appeal to channel {self.appeal_channel.id}")
-             await interaction.followup.send(embed=create_embed("Submission Error", "Could not submit your appeal due to a bot permissions error. Please contact an administrator.", discord.Color.red()), ephemeral=True)
+             log.error("Bot lacks permission to send appeal to channel %s", self.appeal_channel.id)
+             await interaction.followup.send(embed=create_embed("Submission Error", "Could not submit your appeal due to a bot permissions error. Please contact an administrator.", COLOR_RED), ephemeral=True)
         except Exception as e:
-            print(f"[ERROR] Failed submitting appeal: {e}"); traceback.print_exc()
-            await interaction.followup.send(embed=create_embed("Submission Error", "An unexpected error occurred while submitting your appeal.", discord.Color.red()), ephemeral=True)
+            log.exception("Failed submitting appeal: %s", e)
+            await interaction.followup.send(embed=create_embed("Submission Error", "An unexpected error occurred while submitting your appeal.", COLOR_RED), ephemeral=True)
         else: # Only send success if it worked
-            await interaction.followup.send(embed=create_embed("✅ Appeal Submitted", "Your appeal has been successfully sent to the staff for review. You will be contacted if a decision is made.", discord.Color.green()), ephemeral=True)
+            await interaction.followup.send(embed=create_embed("✅ Appeal Submitted", "Your appeal has been successfully sent to the staff for review. You will be contacted if a decision is made.", COLOR_GREEN), ephemeral=True)
 
         await self.cleanup(interaction) # Clean up DM messages
 
     @discord.ui.button(label="Cancel", style=discord.ButtonStyle.danger, emoji="❌")
     async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.defer(ephemeral=True) # Defer ephemerally
-        await interaction.followup.send(embed=create_embed("Appeal Cancelled", "Your appeal submission has been cancelled.", discord.Color.red()), ephemeral=True)
+        await interaction.followup.send(embed=create_embed("Appeal Cancelled", "Your appeal submission has been cancelled.", COLOR_RED), ephemeral=True)
         await self.cleanup(interaction) # Clean up DM messages
 
     async def on_timeout(self):
         # Called if the user doesn't click Submit/Cancel within the timeout period
-        print(f"[INFO] ConfirmAppealView timed out for user {self.message.channel.recipient.id if self.message and self.message.channel else 'unknown'}.")
+        log.info("ConfirmAppealView timed out for user %s.", self.message.channel.recipient.id if self.message and self.message.channel else 'unknown')
         # Disable buttons visually
         for item in self.children: item.disabled = True
         try:
             if self.message: # Check message exists
                  # Edit the confirmation message to indicate timeout
-                 await self.message.edit(embed=create_embed("Appeal Timed Out", "You did not confirm the submission within the time limit (10 minutes). The appeal has been cancelled.", discord.Color.red()), view=self)
+                 await self.message.edit(embed=create_embed("Appeal Timed Out", "You did not confirm the submission within the time limit (10 minutes). The appeal has been cancelled.", COLOR_RED), view=self)
                  # Wait a bit before cleaning up so user sees the message
                  await asyncio.sleep(15)
         except (discord.NotFound, discord.Forbidden): pass # Ignore if message deleted or cannot edit
-        except Exception as e: print(f"[WARNING] Error editing message on ConfirmAppealView timeout: {e}")
+        except Exception as e: log.warning("Error editing message on ConfirmAppealView timeout: %s", e)
         # Clean up all messages from the appeal process
         await self.cleanup()
 
 # --- View for Starting Appeal (DM - Non-persistent) ---
 class AppealStartView(discord.ui.View):
     """View sent in DM to blacklisted user to initiate the appeal process."""
-    def __init__(self, bot_instance: TicketBot, guild: discord.Guild, reason: str):
+    def __init__(self, bot_instance: TicketBot, guild: discord.Guild, user_id: int, reason: str):
         super().__init__(timeout=1800) # 30 minute timeout to click start
         self.bot = bot_instance; self.guild = guild; self.reason = reason; self.message = None
+        self.prompt_key = (guild.id, user_id) # Key in bot._appeal_prompts
+
+    def release(self):
+        """Stops the view and drops it from the bot's live appeal prompts."""
+        self.stop()
+        if self.bot._appeal_prompts.get(self.prompt_key) is self: del self.bot._appeal_prompts[self.prompt_key]
 
     async def ask_question(self, channel, user, embed, min_length=0, check_proof=False, timeout=600.0):
         # Helper to ask question, wait for response, track messages for deletion
@@ -629,8 +1092,8 @@ class AppealStartView(discord.ui.View):
         try:
             ask_msg = await channel.send(embed=embed); bot_msgs_to_delete.append(ask_msg)
             while True:
-                # Wait for a message from the correct user in the correct channel, ignore bots
-                msg = await self.bot.wait_for('message', check=lambda m: m.author == user and m.channel == channel and not m.author.bot, timeout=timeout)
+                # Wait for the next message from the user in this DM channel
+                msg = await self.bot.wait_for_dm_reply(channel, user, timeout)
                 user_msg = msg # Store user message immediately
                 # Add user message to deletion list for this step
                 bot_msgs_to_delete.append(user_msg)
@@ -644,20 +1107,20 @@ class AppealStartView(discord.ui.View):
                 if check_proof: return bot_msgs_to_delete, user_msg # Proof is just the message
                 # For text questions, check minimum length after stripping whitespace
                 if len(msg.content.strip()) < min_length:
-                     err_msg = await channel.send(embed=create_embed("Input Too Short", f"Response must be at least {min_length} characters.", discord.Color.orange())); bot_msgs_to_delete.append(err_msg)
+                     err_msg = await channel.send(embed=create_embed("Input Too Short", f"Response must be at least {min_length} characters.", COLOR_ORANGE)); bot_msgs_to_delete.append(err_msg)
                      continue # Ask again / wait for new message
                 # If valid text answer
                 return bot_msgs_to_delete, user_msg
         except asyncio.TimeoutError:
             # Inform user about timeout
             timeout_minutes = int(timeout/60)
-            await channel.send(embed=create_embed("Timed Out", f"No response received within {timeout_minutes} minutes. Appeal cancelled.", discord.Color.red()))
+            await channel.send(embed=create_embed("Timed Out", f"No response received within {timeout_minutes} minutes. Appeal cancelled.", COLOR_RED))
             # Return None to signal timeout in the main flow
             return bot_msgs_to_delete, None
         except Exception as e:
              # Log unexpected errors during the wait/check process
-             print(f"[ERROR] An error occurred while waiting for user input in appeal DM: {e}"); traceback.print_exc()
-             await channel.send(embed=create_embed("Error", "An error occurred. Appeal cancelled.", discord.Color.red()))
+             log.exception("An error occurred while waiting for user input in appeal DM: %s", e)
+             await channel.send(embed=create_embed("Error", "An error occurred. Appeal cancelled.", COLOR_RED))
              return bot_msgs_to_delete, None # Signal error
 
 
@@ -668,8 +1131,11 @@ class AppealStartView(discord.ui.View):
         for item in self.children: item.disabled = True
         try:
             await interaction.response.edit_message(view=self) # Acknowledge interaction by editing
-        except discord.NotFound: print("[WARNING] AppealStartView: Original message not found, cannot disable button."); return # Stop if message gone
-        except Exception as e: print(f"[ERROR] Editing original message in start_appeal: {e}") # Log other errors and continue
+        except discord.NotFound: log.warning("AppealStartView: Original message not found, cannot disable button."); self.release(); return # Stop if message gone
+        except Exception as e: log.error("Editing original message in start_appeal: %s", e) # Log other errors and continue
+        # The button is disabled now; stop listening so the view isn't held (and timed out) for 30 minutes.
+        # The questionnaire below runs in this coroutine and has its own timeouts.
+        self.release()
 
         channel = interaction.channel; user = interaction.user
         # List to track *all* messages (bot prompts + user answers) for final cleanup
@@ -677,27 +1143,27 @@ class AppealStartView(discord.ui.View):
 
         # Ensure bot instance is available
         current_bot = self.bot or interaction.client
-        if not current_bot: print("[CRITICAL ERROR] Bot instance lost in start_appeal."); await channel.send("An internal bot error occurred."); return
+        if not current_bot: log.critical("Bot instance lost in start_appeal."); await channel.send("An internal bot error occurred."); return
 
         # Verify appeal channel configuration
-        settings = current_bot.get_guild_settings(self.guild.id); appeal_channel_id = settings.get("appeal_channel")
-        if not appeal_channel_id: await channel.send(embed=create_embed("Setup Error", f"The appeal system for **{self.guild.name}** is not configured by the administrators.", discord.Color.red())); return
-        appeal_channel = self.guild.get_channel(appeal_channel_id)
+        settings = current_bot.get_guild_settings(self.guild.id)
+        if not settings.get("appeal_channel"): await channel.send(embed=create_embed("Setup Error", f"The appeal system for **{self.guild.name}** is not configured by the administrators.", COLOR_RED)); return
+        appeal_channel = current_bot.get_setting_text_channel(self.guild, "appeal_channel")
         # Ensure channel exists and is a text channel
-        if not appeal_channel or not isinstance(appeal_channel, discord.TextChannel): await channel.send(embed=create_embed("Setup Error", f"The appeal channel configured for **{self.guild.name}** is invalid or inaccessible.", discord.Color.red())); return
+        if not appeal_channel: await channel.send(embed=create_embed("Setup Error", f"The appeal channel configured for **{self.guild.name}** is invalid or inaccessible.", COLOR_RED)); return
 
         # --- Ask Questions ---
-        q1_embed = create_embed("Appeal Question 1/3", "**Why do you believe your blacklist was incorrect or unfair?** Please provide specific details.", discord.Color.blue()).set_footer(text="Response required (min. 5 characters). 10 minute time limit.")
+        q1_embed = create_embed("Appeal Question 1/3", "**Why do you believe your blacklist was incorrect or unfair?** Please provide specific details.", COLOR_BLUE).set_footer(text="Response required (min. 5 characters). 10 minute time limit.")
         bot_msgs, answer1_msg = await self.ask_question(channel, user, q1_embed, 5, timeout=600.0); messages_to_delete.extend(bot_msgs)
         if not answer1_msg: await self.cleanup_on_fail(messages_to_delete); return # Cleanup if timeout/error
         answers['q1'] = answer1_msg.content.strip() # Store stripped answer
 
-        q2_embed = create_embed("Appeal Question 2/3", "**Why should your blacklist be removed?** What assurances can you provide regarding future conduct, if relevant?", discord.Color.blue()).set_footer(text="Response required (min. 5 characters). 10 minute time limit.")
+        q2_embed = create_embed("Appeal Question 2/3", "**Why should your blacklist be removed?** What assurances can you provide regarding future conduct, if relevant?", COLOR_BLUE).set_footer(text="Response required (min. 5 characters). 10 minute time limit.")
         bot_msgs, answer2_msg = await self.ask_question(channel, user, q2_embed, 5, timeout=600.0); messages_to_delete.extend(bot_msgs)
         if not answer2_msg: await self.cleanup_on_fail(messages_to_delete); return
         answers['q2'] = answer2_msg.content.strip()
 
-        q3_embed = create_embed("Appeal Question 3/3", "**Please provide any supporting evidence** (e.g., screenshots, message links) or any additional statements you wish to make. If you have no evidence, please type `N/A`.", discord.Color.blue()).set_footer(text="Optional response. 10 minute time limit.")
+        q3_embed = create_embed("Appeal Question 3/3", "**Please provide any supporting evidence** (e.g., screenshots, message links) or any additional statements you wish to make. If you have no evidence, please type `N/A`.", COLOR_BLUE).set_footer(text="Optional response. 10 minute time limit.")
         bot_msgs, answer3_msg = await self.ask_question(channel, user, q3_embed, 0, check_proof=True, timeout=600.0); messages_to_delete.extend(bot_msgs)
         if not answer3_msg: await self.cleanup_on_fail(messages_to_delete); return
         # Process proof message (text and attachments)
@@ -710,7 +1176,7 @@ class AppealStartView(discord.ui.View):
         answers['proof'] = proof_content
 
         # --- Confirmation Step ---
-        summary_embed = create_embed("Confirm Your Appeal Submission", "Please review your answers. Press 'Submit Appeal' to send this to the staff or 'Cancel'. This cannot be undone.", discord.Color.green())
+        summary_embed = create_embed("Confirm Your Appeal Submission", "Please review your answers. Press 'Submit Appeal' to send this to the staff or 'Cancel'. This cannot be undone.", COLOR_GREEN)
         summary_embed.add_field(name="1. Reason for appeal (Why unfair?)", value=f"```{answers['q1']}```", inline=False)
         summary_embed.add_field(name="2. Justification for unblacklist", value=f"```{answers['q2']}```", inline=False)
         summary_embed.add_field(name="3. Supporting Proof/Statement", value=answers['proof'], inline=False)
@@ -721,23 +1187,29 @@ class AppealStartView(discord.ui.View):
 
     async def cleanup_on_fail(self, messages: list):
         """Cleans up messages if a step fails before confirm view"""
-        print("[INFO] Cleaning up messages after appeal step failure (timeout/error).")
-        for msg in reversed(messages): # Delete in reverse order
-            try: await msg.delete()
-            except (discord.NotFound, discord.Forbidden): pass # Ignore errors
-            except Exception as e: print(f"[WARNING] Error cleaning up appeal fail message {msg.id}: {e}")
+        log.info("Cleaning up messages after appeal step failure (timeout/error).")
+        await delete_appeal_messages(self.bot.user, messages, "appeal fail")
 
     async def on_timeout(self):
         # Called if the user doesn't click "Start Appeal Process" within 30 minutes
-        print(f"[INFO] AppealStartView timed out (user did not click start).")
+        log.info("AppealStartView timed out (user did not click start).")
+        self.release()
         for item in self.children: item.disabled = True
         try:
              if self.message: # Check message exists
-                await self.message.edit(embed=create_embed(f"Blacklisted on {self.guild.name}", f"Reason:\n```{self.reason}```\nThe window to start an appeal has expired (30 minutes).", discord.Color.red()), view=self)
+                await self.message.edit(embed=create_embed(f"Blacklisted on {self.guild.name}", f"Reason:\n```{self.reason}```\nThe window to start an appeal has expired (30 minutes).", COLOR_RED), view=self)
         except (discord.NotFound, discord.Forbidden): pass
-        except Exception as e: print(f"[WARNING] Failed edit appeal start on timeout: {e}")
+        except Exception as e: log.warning("Failed edit appeal start on timeout: %s", e)
 
 # --- TICKET PANEL VIEW ---
+async def send_ticket_intro(channel: discord.TextChannel, *sends, required=None):
+    """Runs a new ticket's independent opening sends concurrently.
+    Failures of `sends` are only logged; a failure of `required` is re-raised."""
+    results = await asyncio.gather(*sends, *([required] if required else []), return_exceptions=True)
+    for result in results[:len(sends)]:
+        if isinstance(result, Exception): log.warning("Could not send ticket message for %s: %s", channel.id, result)
+    if required and isinstance(results[-1], Exception): raise results[-1] # Logged the others first so they aren't lost
+
 class TicketPanelView(discord.ui.View):
     """Persistent view with buttons to create different types of tickets."""
     # Pass bot instance during init for persistent views
@@ -747,19 +1219,22 @@ class TicketPanelView(discord.ui.View):
 
     async def send_appeal_dm(self, user: discord.Member, guild: discord.Guild, reason: str):
         """Sends the initial DM to blacklisted users with an appeal button."""
-        embed = create_embed(f"Blacklisted on {guild.name}", f"You are currently blacklisted from creating tickets.\n**Reason:**\n```{reason}```\nIf you believe this is a mistake, you may submit an appeal below.", discord.Color.red())
-        if not self.bot: print("ERROR: Cannot get bot instance for AppealStartView."); return
-        view = AppealStartView(bot_instance=self.bot, guild=guild, reason=reason)
+        embed = create_embed(f"Blacklisted on {guild.name}", f"You are currently blacklisted from creating tickets.\n**Reason:**\n```{reason}```\nIf you believe this is a mistake, you may submit an appeal below.", COLOR_RED)
+        if not self.bot: log.error("Cannot get bot instance for AppealStartView."); return
+        existing = self.bot._appeal_prompts.get((guild.id, user.id))
+        if existing and not existing.is_finished(): return # They already have a live appeal prompt in their DMs
+        view = AppealStartView(bot_instance=self.bot, guild=guild, user_id=user.id, reason=reason)
+        self.bot._appeal_prompts[view.prompt_key] = view # Registered before the first await so a quick second click sees it
         try:
             dm_channel = await user.create_dm()
             view.message = await dm_channel.send(embed=embed, view=view) # Store message for timeout handling
-        except discord.Forbidden: print(f"[INFO] Cannot send appeal DM to {user.id} (DMs disabled).")
-        except Exception as e: print(f"[ERROR] Failed to send appeal DM to {user.id}: {e}")
+        except discord.Forbidden: log.info("Cannot send appeal DM to %s (DMs disabled).", user.id); view.release()
+        except Exception as e: log.error("Failed to send appeal DM to %s: %s", user.id, e); view.release()
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         """Checks blacklist and setup status before allowing button press."""
         if not self.bot:
-             print("[CRITICAL ERROR] Bot instance missing in TicketPanelView interaction_check.")
+             log.critical("Bot instance missing in TicketPanelView interaction_check.")
              try:
                  if not interaction.response.is_done(): await interaction.response.send_message("Internal bot error. Please try again later.", ephemeral=True)
                  else: await interaction.followup.send("Internal bot error. Please try again later.", ephemeral=True)
@@ -767,13 +1242,12 @@ class TicketPanelView(discord.ui.View):
              return False
         if not interaction.guild: return False
 
-        settings = self.bot.get_guild_settings(interaction.guild.id)
-        blacklist = settings.get("blacklist", {}); user_id_str = str(interaction.user.id)
-
+        settings = interaction_settings(interaction) # Cached on the interaction for the button callback
         # --- BLACKLIST CHECK ---
-        if user_id_str in blacklist:
-            reason = blacklist.get(user_id_str, "No reason provided.")
-            await send_embed_response(interaction, "Action Denied", "You are currently blacklisted and cannot create new tickets.", discord.Color.red(), ephemeral=True)
+        blacklist = settings["blacklist"] # Keyed by int user ID
+        if interaction.user.id in blacklist: # Membership, not the reason: a stored reason may be null
+            reason = blacklist.get(interaction.user.id) or "No reason provided."
+            await send_embed(interaction, EMBED_BLACKLISTED)
             asyncio.create_task(self.send_appeal_dm(interaction.user, interaction.guild, reason))
             return False
 
@@ -788,87 +1262,92 @@ class TicketPanelView(discord.ui.View):
     @discord.ui.button(label="Standard Ticket", style=discord.ButtonStyle.primary, emoji="🎫", custom_id="persistent_panel:standard")
     async def standard_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Handles the creation of a standard support ticket."""
-        settings = self.bot.get_guild_settings(interaction.guild.id)
+        settings = interaction_settings(interaction) # Already fetched by interaction_check
         TICKET_TYPE = "standard"; LIMIT = 3; category_id = settings.get('ticket_category')
-        if not category_id: await send_embed_response(interaction, "Setup Error", "Ticket category not configured.", discord.Color.red()); return
-        current_tickets = count_user_tickets(interaction.guild, interaction.user.id, category_id, TICKET_TYPE)
-        if current_tickets >= LIMIT: await send_embed_response(interaction, "Limit Reached", f"You may only have {LIMIT} open standard tickets at a time.", discord.Color.orange()); return
+        if not category_id: await send_embed_response(interaction, "Setup Error", "Ticket category not configured.", COLOR_RED); return
+        current_tickets = count_user_tickets(interaction.guild, interaction.user.id, TICKET_TYPE)
+        if current_tickets >= LIMIT: await send_embed_response(interaction, "Limit Reached", f"You may only have {LIMIT} open standard tickets at a time.", COLOR_ORANGE); return
 
         await interaction.response.defer(ephemeral=True, thinking=True)
         channel, staff_role = await create_ticket_channel(interaction, TICKET_TYPE, settings)
         if channel and staff_role:
-            await interaction.followup.send(embed=create_embed("Ticket Created", f"Your standard ticket is ready: {channel.mention}", discord.Color.green()), ephemeral=True)
-            embed = discord.Embed(title="🎫 Standard Support Ticket", description=f"Welcome, {interaction.user.mention}!\nPlease describe your question or issue in detail. A member of the {staff_role.mention} team will assist you shortly.", color=discord.Color.blue())
-            # Pass bot instance to the view in the channel
-            await channel.send(embed=embed, content=f"{interaction.user.mention} {staff_role.mention}", view=TicketCloseView(self.bot))
+            embed = discord.Embed(title="🎫 Standard Support Ticket", description=f"Welcome, {interaction.user.mention}!\nPlease describe your question or issue in detail. A member of the {staff_role.mention} team will assist you shortly.", color=COLOR_BLUE)
+            # The confirmation and the welcome message (with the shared persistent close view) are independent; send them concurrently
+            await send_ticket_intro(channel,
+                interaction.followup.send(embed=create_embed("Ticket Created", f"Your standard ticket is ready: {channel.mention}", COLOR_GREEN), ephemeral=True),
+                channel.send(embed=embed, content=f"{interaction.user.mention} {staff_role.mention}", view=self.bot.ticket_close_view))
 
     @discord.ui.button(label="Tryout Application", style=discord.ButtonStyle.success, emoji="⚔️", custom_id="persistent_panel:tryout")
     async def tryout_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Handles the tryout application ticket process."""
-        settings = self.bot.get_guild_settings(interaction.guild.id)
+        settings = interaction_settings(interaction) # Already fetched by interaction_check
         TICKET_TYPE = "tryout"; LIMIT = 1; category_id = settings.get('ticket_category')
-        if not category_id: await send_embed_response(interaction, "Setup Error", "Ticket category not configured.", discord.Color.red()); return
-        current_tickets = count_user_tickets(interaction.guild, interaction.user.id, category_id, TICKET_TYPE)
-        if current_tickets >= LIMIT: await send_embed_response(interaction, "Limit Reached", f"You may only have {LIMIT} open tryout application.", discord.Color.orange()); return
+        if not category_id: await send_embed_response(interaction, "Setup Error", "Ticket category not configured.", COLOR_RED); return
+        current_tickets = count_user_tickets(interaction.guild, interaction.user.id, TICKET_TYPE)
+        if current_tickets >= LIMIT: await send_embed_response(interaction, "Limit Reached", f"You may only have {LIMIT} open tryout application.", COLOR_ORANGE); return
 
         await interaction.response.defer(ephemeral=True, thinking=True)
         channel, staff_role = await create_ticket_channel(interaction, TICKET_TYPE, settings)
         if not channel or not staff_role: return
 
-        await interaction.followup.send(embed=create_embed("Ticket Created", f"Tryout channel ready: {channel.mention}", discord.Color.green()), ephemeral=True)
-        try: await channel.send(f"{interaction.user.mention} {staff_role.mention}", delete_after=1)
-        except Exception as e: print(f"[WARNING] Could not send ping in {channel.id}: {e}")
-
         # --- Tryout Application Logic ---
         try:
-            username_embed = create_embed("⚔️ Tryout Application - Step 1/2", "Please reply with your Roblox Username.", discord.Color.green()).set_footer(text="5 minute limit.")
-            await channel.send(embed=username_embed)
-            def check_username(m): return m.channel == channel and m.author == interaction.user and not m.author.bot
-            username_msg = await self.bot.wait_for('message', check=check_username, timeout=300.0)
+            username_embed = create_embed("⚔️ Tryout Application - Step 1/2", "Please reply with your Roblox Username.", COLOR_GREEN).set_footer(text="5 minute limit.")
+            async def ping_then_ask():
+                # In-channel sends stay ordered: the ping the user is notified by, then the first question
+                try: await channel.send(f"{interaction.user.mention} {staff_role.mention}", delete_after=1)
+                except Exception as e: log.warning("Could not send ticket message for %s: %s", channel.id, e)
+                await channel.send(embed=username_embed)
+            # Only the ephemeral confirmation runs concurrently with the in-channel messages
+            await send_ticket_intro(channel,
+                interaction.followup.send(embed=create_embed("Ticket Created", f"Tryout channel ready: {channel.mention}", COLOR_GREEN), ephemeral=True),
+                required=ping_then_ask())
+            username_msg = await self.bot.wait_for('message', check=MessageFromCheck(interaction.user, channel), timeout=300.0)
             roblox_username = username_msg.content.strip()
 
-            stats_embed = create_embed("⚔️ Tryout Application - Step 2/2", f"`{roblox_username}`\nSend stats screenshot.", discord.Color.green()).set_footer(text="5 minute limit. Must be image.")
+            stats_embed = create_embed("⚔️ Tryout Application - Step 2/2", f"`{roblox_username}`\nSend stats screenshot.", COLOR_GREEN).set_footer(text="5 minute limit. Must be image.")
             await channel.send(embed=stats_embed)
-            def check_stats(m): return m.channel == channel and m.author == interaction.user and not m.author.bot and m.attachments and m.attachments[0].content_type and m.attachments[0].content_type.startswith('image')
-            stats_msg = await self.bot.wait_for('message', check=check_stats, timeout=300.0)
+            stats_msg = await self.bot.wait_for('message', check=MessageFromCheck(interaction.user, channel, require_image=True), timeout=300.0)
             stats_screenshot_url = stats_msg.attachments[0].url if stats_msg.attachments else None
 
-            success_embed = create_embed("✅ Tryout Application Submitted", f"{interaction.user.mention}, {staff_role.mention} will review.", discord.Color.brand_green())
+            success_embed = create_embed("✅ Tryout Application Submitted", f"{interaction.user.mention}, {staff_role.mention} will review.", COLOR_BRAND_GREEN)
             success_embed.add_field(name="Roblox Username", value=roblox_username, inline=False)
             if stats_screenshot_url:
                 try: success_embed.set_image(url=stats_screenshot_url)
-                except Exception as e: print(f"[ERROR] Setting image URL: {e}"); success_embed.add_field(name="Image Error", value="Could not embed.", inline=False)
+                except Exception as e: log.error("Setting image URL: %s", e); success_embed.add_field(name="Image Error", value="Could not embed.", inline=False)
             else: success_embed.add_field(name="Stats Screenshot", value="Not provided.", inline=False)
 
-            # Pass bot instance
-            await channel.send(embed=success_embed, view=TicketCloseView(self.bot))
+            # Attach the shared persistent close view
+            await channel.send(embed=success_embed, view=self.bot.ticket_close_view)
 
         except asyncio.TimeoutError:
-            timeout_embed = create_embed("Ticket Closed Automatically", "Inactivity during application.", discord.Color.red())
-            try: await channel.send(embed=timeout_embed); await asyncio.sleep(10); await channel.delete(reason="Tryout timeout")
+            timeout_embed = create_embed("Ticket Closed Automatically", "Inactivity during application.", COLOR_RED)
+            try: await channel.send(embed=timeout_embed)
             except (discord.NotFound, discord.Forbidden): pass
-            except Exception as e: print(f"[ERROR] Timeout cleanup: {e}")
+            except Exception as e: log.error("Timeout cleanup: %s", e)
+            self.bot.schedule_channel_delete(channel, 10, "Tryout timeout")
         except Exception as e:
-            print(f"[ERROR] Tryout process ({getattr(channel, 'id', 'N/A')}): {e}"); traceback.print_exc()
-            try: await channel.send(embed=create_embed("Application Error", "Unexpected error. Close ticket & try again.", discord.Color.red()))
+            log.exception("Tryout process (%s): %s", getattr(channel, 'id', 'N/A'), e)
+            try: await channel.send(embed=create_embed("Application Error", "Unexpected error. Close ticket & try again.", COLOR_RED))
             except Exception: pass
 
     @discord.ui.button(label="Report a User", style=discord.ButtonStyle.danger, emoji="🚨", custom_id="persistent_panel:report")
     async def report_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Handles the creation of a user report ticket."""
-        settings = self.bot.get_guild_settings(interaction.guild.id)
+        settings = interaction_settings(interaction) # Already fetched by interaction_check
         TICKET_TYPE = "report"; LIMIT = 10; category_id = settings.get('ticket_category')
-        if not category_id: await send_embed_response(interaction, "Setup Error", "Ticket category not configured.", discord.Color.red()); return
-        current_tickets = count_user_tickets(interaction.guild, interaction.user.id, category_id, TICKET_TYPE)
-        if current_tickets >= LIMIT: await send_embed_response(interaction, "Limit Reached", f"Max {LIMIT} open report tickets.", discord.Color.orange()); return
+        if not category_id: await send_embed_response(interaction, "Setup Error", "Ticket category not configured.", COLOR_RED); return
+        current_tickets = count_user_tickets(interaction.guild, interaction.user.id, TICKET_TYPE)
+        if current_tickets >= LIMIT: await send_embed_response(interaction, "Limit Reached", f"Max {LIMIT} open report tickets.", COLOR_ORANGE); return
 
         await interaction.response.defer(ephemeral=True, thinking=True)
         channel, staff_role = await create_ticket_channel(interaction, TICKET_TYPE, settings)
         if channel and staff_role:
-            await interaction.followup.send(embed=create_embed("Ticket Created", f"Report channel ready: {channel.mention}", discord.Color.green()), ephemeral=True)
-            embed = discord.Embed(title="🚨 User Report", description=f"{interaction.user.mention}, provide info:\n1. Username\n2. Reason\n3. Details\n4. Proof\n{staff_role.mention} will review.", color=discord.Color.red())
-            # Pass bot instance
-            await channel.send(embed=embed, content=f"{interaction.user.mention} {staff_role.mention}", view=TicketCloseView(self.bot))
+            embed = discord.Embed(title="🚨 User Report", description=f"{interaction.user.mention}, provide info:\n1. Username\n2. Reason\n3. Details\n4. Proof\n{staff_role.mention} will review.", color=COLOR_RED)
+            # The confirmation and the report prompt (with the shared persistent close view) are independent; send them concurrently
+            await send_ticket_intro(channel,
+                interaction.followup.send(embed=create_embed("Ticket Created", f"Report channel ready: {channel.mention}", COLOR_GREEN), ephemeral=True),
+                channel.send(embed=embed, content=f"{interaction.user.mention} {staff_role.mention}", view=self.bot.ticket_close_view))
 
 # --- MODAL FOR TICKET CLOSE REASON ---
 class CloseReasonModal(discord.ui.Modal, title="Reason for Closing Ticket"):
@@ -888,18 +1367,17 @@ class CloseReasonModal(discord.ui.Modal, title="Reason for Closing Ticket"):
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True, thinking=True)
         reason = self.reason_input.value
-        view_instance = TicketCloseView(self.bot)
         try:
-            await view_instance.close_ticket_logic(self.target_channel, self.closer, reason)
+            await self.bot.ticket_close_view.close_ticket_logic(self.target_channel, self.closer, reason)
             await interaction.followup.send("✅ Ticket closing process initiated.", ephemeral=True)
         except Exception as e:
-            print(f"Error calling close_ticket_logic from modal: {e}"); traceback.print_exc()
+            log.exception("Error calling close_ticket_logic from modal: %s", e)
             await interaction.followup.send("❌ Failed to initiate ticket closing.", ephemeral=True)
 
     async def on_error(self, interaction: discord.Interaction, error: Exception):
-        print(f"ERROR in CloseReasonModal: {error}"); traceback.print_exc()
-        try: await send_embed_response(interaction, "Error", "An error occurred submitting the reason.", discord.Color.red())
-        except Exception as e: print(f"Error sending on_error in CloseReasonModal: {e}")
+        log.error("Error in CloseReasonModal: %s", error, exc_info=error)
+        try: await send_embed_response(interaction, "Error", "An error occurred submitting the reason.", COLOR_RED)
+        except Exception as e: log.error("Error sending on_error in CloseReasonModal: %s", e)
 
 # --- PERSISTENT TICKET CLOSE VIEW ---
 class TicketCloseView(discord.ui.View):
@@ -911,10 +1389,10 @@ class TicketCloseView(discord.ui.View):
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         """Ensure bot instance is present before running button callbacks."""
         if not self.bot:
-             print(f"TicketCloseView interaction_check: Bot instance missing, attempting to get from client.")
+             log.warning("TicketCloseView interaction_check: Bot instance missing, attempting to get from client.")
              self.bot = interaction.client # Try to get bot instance
              if not self.bot:
-                  print("CRITICAL ERROR: Could not get bot instance in TicketCloseView.")
+                  log.critical("Could not get bot instance in TicketCloseView.")
                   try:
                       if not interaction.response.is_done(): await interaction.response.send_message("Internal bot error. Cannot process action.", ephemeral=True)
                       else: await interaction.followup.send("Internal bot error. Cannot process action.", ephemeral=True)
@@ -925,94 +1403,90 @@ class TicketCloseView(discord.ui.View):
     @discord.ui.button(label="Close Ticket", style=discord.ButtonStyle.danger, emoji="🔒", custom_id="persistent_ticket:close")
     async def close_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Opens modal to ask for close reason after permission check."""
-        settings = self.bot.get_guild_settings(interaction.guild.id); staff_role_id = settings.get('staff_role')
-        staff_role = interaction.guild.get_role(staff_role_id) if staff_role_id else None
-        if not isinstance(interaction.user, discord.Member): await send_embed_response(interaction, "Error", "Could not verify permissions.", discord.Color.red()); return
-        is_admin = interaction.user.guild_permissions.administrator; is_staff = (staff_role and staff_role in interaction.user.roles)
-        can_close = False; channel_topic = getattr(interaction.channel, 'topic', '') or ""
-        if f"ticket-user-{interaction.user.id}" in channel_topic: can_close = True # Creator
-        elif is_staff or is_admin: can_close = True # Staff/Admin
-        if not can_close: await send_embed_response(interaction, "Permission Denied", "Only creator or staff.", discord.Color.red()); return
+        if not isinstance(interaction.user, discord.Member): await send_embed(interaction, EMBED_CANNOT_VERIFY); return
+        can_close = False; parsed_topic = parse_ticket_topic(getattr(interaction.channel, 'topic', None))
+        if parsed_topic and parsed_topic[0] == interaction.user.id: can_close = True # Creator
+        elif is_staff_member(interaction.user, self.bot.get_guild_settings(interaction.guild.id).get('staff_role')): can_close = True # Staff/Admin
+        if not can_close: await send_embed_response(interaction, "Permission Denied", "Only creator or staff.", COLOR_RED); return
         modal = CloseReasonModal(bot_instance=self.bot, target_channel=interaction.channel, closer=interaction.user)
         await interaction.response.send_modal(modal)
 
     @discord.ui.button(label="Delete Ticket", style=discord.ButtonStyle.secondary, emoji="🗑️", custom_id="persistent_ticket:delete")
     async def delete_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Permanently deletes ticket, staff/admin only."""
-        settings = self.bot.get_guild_settings(interaction.guild.id); staff_role_id = settings.get('staff_role')
-        if not staff_role_id or not (staff_role := interaction.guild.get_role(staff_role_id)): await send_embed_response(interaction, "Setup Error", "Staff role invalid.", discord.Color.red()); return
-        if not isinstance(interaction.user, discord.Member): await send_embed_response(interaction, "Error", "Could not verify permissions.", discord.Color.red()); return
-        is_admin = interaction.user.guild_permissions.administrator; is_staff = staff_role in interaction.user.roles
-        if not is_staff and not is_admin: await send_embed_response(interaction, "Permission Denied", "Staff/Admin only.", discord.Color.red()); return
+        if not (staff_role := self.bot.get_setting_role(interaction.guild, 'staff_role')): await send_embed_response(interaction, "Setup Error", "Staff role invalid.", COLOR_RED); return
+        if not isinstance(interaction.user, discord.Member): await send_embed(interaction, EMBED_CANNOT_VERIFY); return
+        if not is_staff_member(interaction.user, staff_role.id): await send_embed_response(interaction, "Permission Denied", "Staff/Admin only.", COLOR_RED); return
+
+        # The countdown runs on the event loop's timer; this handler returns right away
+        if not self.bot.schedule_channel_delete(interaction.channel, 10, f"Deleted by {interaction.user.name} ({interaction.user.id})"):
+            await send_embed_response(interaction, "Already Scheduled", "This ticket is already being deleted.", COLOR_ORANGE); return
 
         await interaction.response.defer(ephemeral=True, thinking=True)
-        embed = create_embed("🗑️ Confirm Ticket Deletion", f"Ticket will be **permanently deleted** by {interaction.user.mention} in 10 seconds.", discord.Color.dark_red())
+        embed = create_embed("🗑️ Confirm Ticket Deletion", f"Ticket will be **permanently deleted** by {interaction.user.mention} in 10 seconds.", COLOR_DARK_RED)
         await interaction.channel.send(embed=embed) # Non-ephemeral warning
         await interaction.followup.send("Deletion initiated.", ephemeral=True)
-        await asyncio.sleep(10)
-        try: await interaction.channel.delete(reason=f"Deleted by {interaction.user.name} ({interaction.user.id})")
-        except discord.NotFound: pass
-        except discord.Forbidden: print(f"ERROR: Lacking delete permissions for {interaction.channel.id}")
-        except Exception as e: print(f"ERROR deleting ticket {interaction.channel.id}: {e}"); traceback.print_exc()
 
     async def close_ticket_logic(self, channel: discord.TextChannel, user: discord.Member, reason: str = "No reason provided"):
         """Handles transcript generation, messaging, and channel archival."""
         guild = channel.guild
-        if not guild: print(f"ERROR: No guild context for channel {channel.id}."); return
-        if not self.bot: print("CRITICAL ERROR: Bot instance missing in close_ticket_logic."); await channel.send("Internal error."); return
-
-        settings = self.bot.get_guild_settings(guild.id)
-        archive_category_id = settings.get('archive_category')
-        if not archive_category_id or not (archive_category := guild.get_channel(archive_category_id)) or not isinstance(archive_category, discord.CategoryChannel):
-            await channel.send(embed=create_embed("Configuration Error", "Archive category invalid.", discord.Color.red())); return
-
-        closing_msg = None
-        try: closing_msg = await channel.send(embed=create_embed("Archiving Ticket...", f"Closing by {user.mention}. Generating transcript...", discord.Color.light_grey()))
-        except Exception as e: print(f"Error sending 'Archiving' msg: {e}")
-
-        transcript_file = await generate_transcript(channel)
-        embed = discord.Embed(title="Ticket Closed", description=f"Closed by: {user.mention}\n**Reason:**\n```{reason}```", color=discord.Color.orange())
-        transcript_file.seek(0); transcript_message = None
-        try: transcript_message = await channel.send(embed=embed, file=discord.File(transcript_file, filename=f"{channel.name}-transcript.txt"))
-        except discord.HTTPException as e:
-            if e.code == 40005: await channel.send(embed=create_embed("Transcript Too Large", "Archiving without upload.", discord.Color.orange()))
-            else: await channel.send(embed=create_embed("Error", f"Upload failed (HTTP {e.code}): {e.text}", discord.Color.red()))
-            try: await channel.send(embed=embed) # Send embed anyway
-            except Exception: pass
-        except discord.Forbidden: await channel.send(embed=create_embed("Error", "Lacking send/file permissions.", discord.Color.red()))
-        except Exception as e: print(f"ERROR sending transcript: {e}"); traceback.print_exc(); await channel.send(embed=create_embed("Error", "Transcript send error.", discord.Color.red()))
-
-        # Clean up "Closing..." message
-        if closing_msg:
+        if not guild: log.error("No guild context for channel %s.", channel.id); return
+        if not self.bot: log.critical("Bot instance missing in close_ticket_logic."); await channel.send("Internal error."); return
+
+        archive_category = self.bot.get_setting_category(guild, 'archive_category')
+        if not archive_category:
+            await channel.send(embed=create_embed("Configuration Error", "Archive category invalid.", COLOR_RED)); return
+
+        async def send_closing_msg():
+            try: return await channel.send(embed=create_embed("Archiving Ticket...", f"Closing by {user.mention}. Generating transcript...", COLOR_LIGHT_GREY))
+            except Exception as e: log.error("Error sending 'Archiving' msg: %s", e)
+
+        # Post the notice while the transcript is being read (it's a bot message without attachments, so the transcript skips it anyway)
+        closing_msg, transcript_file = await asyncio.gather(send_closing_msg(), generate_transcript(channel))
+        transcript_filename = f"{channel.name}-transcript.txt" # Captured before the archive rename below
+        embed = discord.Embed(title="Ticket Closed", description=f"Closed by: {user.mention}\n**Reason:**\n```{reason}```", color=COLOR_ORANGE)
+
+        async def send_transcript():
+            transcript_file.seek(0)
+            try: await channel.send(embed=embed, file=discord.File(transcript_file, filename=transcript_filename))
+            except discord.Forbidden: await channel.send(embed=create_embed("Error", "Lacking send/file permissions.", COLOR_RED)) # Before HTTPException, which it subclasses
+            except discord.HTTPException as e:
+                if e.code == 40005: await channel.send(embed=create_embed("Transcript Too Large", "Archiving without upload.", COLOR_ORANGE))
+                else: await channel.send(embed=create_embed("Error", f"Upload failed (HTTP {e.code}): {e.text}", COLOR_RED))
+                try: await channel.send(embed=embed) # Send embed anyway
+                except Exception: pass
+            except Exception as e: log.exception("Error sending transcript: %s", e); await channel.send(embed=create_embed("Error", "Transcript send error.", COLOR_RED))
+
+        async def post_status(status_embed: discord.Embed):
+            # Reuse the "Archiving..." message for the final status (one edit instead of a delete + send)
+            if closing_msg:
+                try: await closing_msg.edit(embed=status_embed); return
+                except (discord.NotFound, discord.Forbidden): pass # Message gone or no perms, send a new one instead
+                except Exception as e: log.error("Error editing 'closing' message: %s", e)
+            await channel.send(embed=status_embed)
+
+        async def archive_channel():
+            overwrites = self.bot.get_archive_overwrites(guild)
             try:
-                await closing_msg.delete()
-            except (discord.NotFound, discord.Forbidden): # Be specific about expected errors
-                pass # Ignore if message is gone or we lack perms
-            except Exception as e:
-                print(f"Error deleting 'closing' message: {e}") # Log unexpected errors
-
-        await asyncio.sleep(3)
-
-        overwrites = {guild.default_role: discord.PermissionOverwrite(view_channel=False), guild.me: discord.PermissionOverwrite(view_channel=True, read_messages=True, send_messages=True)}
-        staff_role_id = settings.get('staff_role')
-        if staff_role_id and (staff_role := guild.get_role(staff_role_id)): overwrites[staff_role] = discord.PermissionOverwrite(view_channel=True, read_messages=True, send_messages=False)
-        try:
-            base_name = channel.name.replace("closed-","")[:75]; closed_name = f"closed-{base_name}-{channel.id}"[:100]
-            await channel.edit(name=closed_name, category=archive_category, overwrites=overwrites, reason=f"Closed by {user.name}. Reason: {reason}")
-
-            # Attempt to remove view from the transcript message if it was sent successfully
-            if transcript_message:
-                 try:
-                     await transcript_message.edit(view=None)
-                 except (discord.NotFound, discord.Forbidden): # Handle specific expected errors
-                     pass # Ignore if message gone or no perms
-                 except Exception as edit_err:
-                     print(f"Failed to remove view from transcript msg: {edit_err}") # Log other errors
-
-            await channel.send(embed=create_embed("Ticket Archived", f"Moved to {archive_category.name} and locked.", discord.Color.greyple()))
-        except discord.Forbidden: print(f"ERROR: Lacking move/edit perms for {channel.id}."); await channel.send(embed=create_embed("Error", "Lacking archive permissions.", discord.Color.red()))
-        except discord.NotFound: print(f"WARNING: Channel {channel.id} not found during archival.")
-        except Exception as e: print(f"ERROR archiving {channel.id}: {e}"); traceback.print_exc(); await channel.send(embed=create_embed("Error", "Archival error.", discord.Color.red()))
+                if channel.name.startswith("closed-"):
+                    closed_name = channel.name # Already closed once; don't stack another prefix/ID suffix
+                else:
+                    base_name = channel.name[:75]; closed_name = f"closed-{base_name}-{channel.id}"[:100]
+                # Still archive if the rename budget is spent; the name just stays as-is
+                rename = {} if channel_edit_retry_after(channel.id) else {"name": closed_name}
+                await safe_channel_edit(channel, **rename, category=archive_category, overwrites=overwrites, reason=f"Closed by {user.name}. Reason: {reason}")
+                self.bot.remove_from_index(channel.id) # No longer an open ticket
+
+                await post_status(create_embed("Ticket Archived", f"Moved to {archive_category.name} and locked.", COLOR_GREYPLE))
+            except discord.Forbidden: log.error("Lacking move/edit perms for %s.", channel.id); await post_status(create_embed("Error", "Lacking archive permissions.", COLOR_RED))
+            except discord.NotFound: log.warning("Channel %s not found during archival.", channel.id)
+            except Exception as e: log.exception("Error archiving %s: %s", channel.id, e); await post_status(create_embed("Error", "Archival error.", COLOR_RED))
+
+        # The upload and the archive edit don't depend on each other, so run them concurrently
+        # (each handles its own errors; the bot keeps send permissions in the archive)
+        results = await asyncio.gather(send_transcript(), archive_channel(), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception): log.error("Error during ticket close for %s: %s", channel.id, result)
 
 # End of Part 3/5
 # bot.py (Part 4/5)
@@ -1055,75 +1529,82 @@ async def set_panel_channel(interaction: discord.Interaction, channel: discord.T
     """Sets the channel for the ticket creation panel."""
     # Admin check is handled by the group's default_permissions
     bot.update_guild_setting(interaction.guild.id, "panel_channel", channel.id)
-    await send_embed_response(interaction, "Setup Complete", f"The ticket panel channel has been successfully set to {channel.mention}.", discord.Color.green())
+    await send_embed_response(interaction, "Setup Complete", f"The ticket panel channel has been successfully set to {channel.mention}.", COLOR_GREEN)
 
 @setup_group.command(name="ticket_category", description="Sets the category where new tickets will be created.")
 @app_commands.describe(category="The category channel for new tickets.")
 async def set_ticket_category(interaction: discord.Interaction, category: discord.CategoryChannel):
     """Sets the category for new tickets."""
     bot.update_guild_setting(interaction.guild.id, "ticket_category", category.id)
-    await send_embed_response(interaction, "Setup Complete", f"New tickets will now be created in the `{category.name}` category.", discord.Color.green())
+    bot.rebuild_ticket_index(interaction.guild) # Re-index open tickets from the new category
+    await send_embed_response(interaction, "Setup Complete", f"New tickets will now be created in the `{category.name}` category.", COLOR_GREEN)
 
 @setup_group.command(name="archive_category", description="Sets the category where closed tickets will be moved.")
 @app_commands.describe(category="The category channel for archived tickets.")
 async def set_archive_category(interaction: discord.Interaction, category: discord.CategoryChannel):
     """Sets the category for archived tickets."""
     bot.update_guild_setting(interaction.guild.id, "archive_category", category.id)
-    await send_embed_response(interaction, "Setup Complete", f"Closed tickets will be moved to the `{category.name}` category.", discord.Color.green())
+    await send_embed_response(interaction, "Setup Complete", f"Closed tickets will be moved to the `{category.name}` category.", COLOR_GREEN)
 
 @setup_group.command(name="staff_role", description="Sets the primary staff role for ticket access and pings.")
 @app_commands.describe(role="The role designated as staff.")
 async def set_staff_role(interaction: discord.Interaction, role: discord.Role):
     """Sets the main staff role."""
     bot.update_guild_setting(interaction.guild.id, "staff_role", role.id)
-    await send_embed_response(interaction, "Setup Complete", f"The staff role has been set to {role.mention}.", discord.Color.green())
+    await send_embed_response(interaction, "Setup Complete", f"The staff role has been set to {role.mention}.", COLOR_GREEN)
 
 @setup_group.command(name="escalation_role", description="Sets the senior staff role pinged by /ticket escalate.")
 @app_commands.describe(role="The role to ping for ticket escalations.")
 async def set_escalation_role(interaction: discord.Interaction, role: discord.Role):
     """Sets the escalation role."""
     bot.update_guild_setting(interaction.guild.id, "escalation_role", role.id)
-    await send_embed_response(interaction, "Setup Complete", f"The escalation role has been set to {role.mention}.", discord.Color.green())
+    await send_embed_response(interaction, "Setup Complete", f"The escalation role has been set to {role.mention}.", COLOR_GREEN)
 
 @setup_group.command(name="appeal_channel", description="Sets the channel where blacklist appeals are sent.")
 @app_commands.describe(channel="The channel for staff to review appeals.")
 async def set_appeal_channel(interaction: discord.Interaction, channel: discord.TextChannel):
     """Sets the blacklist appeal channel."""
     bot.update_guild_setting(interaction.guild.id, "appeal_channel", channel.id)
-    await send_embed_response(interaction, "Setup Complete", f"Blacklist appeals will now be sent to {channel.mention}.", discord.Color.green())
+    await send_embed_response(interaction, "Setup Complete", f"Blacklist appeals will now be sent to {channel.mention}.", COLOR_GREEN)
 
 # --- PANEL CREATION COMMAND (Now under /setup group) ---
+@functools.lru_cache(maxsize=256)
+def build_panel_embed(guild_name: str, icon_url: str = None) -> discord.Embed:
+    """Builds the ticket panel embed. Cached per guild name/icon; the returned embed must not be modified."""
+    embed = discord.Embed(title="Support & Tryouts", description="To create a ticket, please select the appropriate option below.", color=0x2b2d31)
+    if icon_url: embed.set_thumbnail(url=icon_url)
+    embed.add_field(name="🎫 Standard Ticket", value="For general help, questions, or other issues.", inline=False)
+    embed.add_field(name="⚔️ Tryout Application", value="Apply to join the clan by completing a short application.", inline=False)
+    embed.add_field(name="🚨 Report a User", value="Submit a report against a user for rule violations. Please have evidence ready.", inline=False)
+    embed.set_footer(text=f"{guild_name} Support System")
+    return embed
+
 @setup_group.command(name="create_panel", description="Sends the ticket creation panel to the configured channel.")
 async def create_panel(interaction: discord.Interaction):
     """Sends the ticket creation panel."""
+    # The panel send is a network round trip; defer so a slow send can't outlive the 3s response window
+    await interaction.response.defer(ephemeral=True)
     if not await check_setup(interaction): return # Verify setup is complete
 
-    settings = bot.get_guild_settings(interaction.guild.id)
-    panel_channel_id = settings.get('panel_channel')
-    panel_channel = bot.get_channel(panel_channel_id) if panel_channel_id else None
+    panel_channel = bot.get_setting_text_channel(interaction.guild, 'panel_channel') # Cached, type-checked lookup
 
-    if not panel_channel or not isinstance(panel_channel, discord.TextChannel):
-        await send_embed_response(interaction, "Configuration Error", "The panel channel is invalid or not found.", discord.Color.red()); return
+    if not panel_channel:
+        await send_embed_response(interaction, "Configuration Error", "The panel channel is invalid or not found.", COLOR_RED); return
 
     # Check bot permissions in the target channel before sending
     bot_member = interaction.guild.me
     perms = panel_channel.permissions_for(bot_member)
     if not perms.send_messages or not perms.embed_links:
-         await send_embed_response(interaction, "Permissions Error", f"I lack the necessary permissions (Send Messages, Embed Links) in {panel_channel.mention}.", discord.Color.red()); return
+         await send_embed_response(interaction, "Permissions Error", f"I lack the necessary permissions (Send Messages, Embed Links) in {panel_channel.mention}.", COLOR_RED); return
 
-    embed = discord.Embed(title="Support & Tryouts", description="To create a ticket, please select the appropriate option below.", color=0x2b2d31)
-    if interaction.guild.icon: embed.set_thumbnail(url=interaction.guild.icon.url)
-    embed.add_field(name="🎫 Standard Ticket", value="For general help, questions, or other issues.", inline=False)
-    embed.add_field(name="⚔️ Tryout Application", value="Apply to join the clan by completing a short application.", inline=False)
-    embed.add_field(name="🚨 Report a User", value="Submit a report against a user for rule violations. Please have evidence ready.", inline=False)
-    embed.set_footer(text=f"{interaction.guild.name} Support System")
+    embed = build_panel_embed(interaction.guild.name, interaction.guild.icon.url if interaction.guild.icon else None)
     try:
-        # Pass the bot instance to the persistent view
-        await panel_channel.send(embed=embed, view=TicketPanelView(bot))
-        await send_embed_response(interaction, "Panel Created", f"The ticket panel has been successfully sent to {panel_channel.mention}.", discord.Color.green())
+        # Attach the shared persistent panel view
+        await panel_channel.send(embed=embed, view=bot.ticket_panel_view)
+        await send_embed_response(interaction, "Panel Created", f"The ticket panel has been successfully sent to {panel_channel.mention}.", COLOR_GREEN)
     except Exception as e:
-        print(f"[ERROR] Failed to send ticket panel: {e}"); traceback.print_exc()
-        await send_embed_response(interaction, "Error", "An unexpected error occurred while attempting to send the panel.", discord.Color.red())
+        log.exception("Failed to send ticket panel: %s", e)
+        await send_embed_response(interaction, "Error", "An unexpected error occurred while attempting to send the panel.", COLOR_RED)
 
 # --- PERMISSION CHECK DECORATORS FOR SLASH COMMANDS ---
 
@@ -1132,18 +1613,12 @@ async def is_staff_interaction(interaction: discord.Interaction) -> bool:
     if not interaction.guild: return False # Should not happen in guild_only commands
     if not isinstance(interaction.user, discord.Member): return False # Ensure user is a member
 
-    settings = bot.get_guild_settings(interaction.guild.id)
-    staff_role_id = settings.get('staff_role')
-    staff_role = interaction.guild.get_role(staff_role_id) if staff_role_id else None
-
-    # Check for administrator permissions first, then for the staff role
-    if interaction.user.guild_permissions.administrator:
-        return True
-    if staff_role and staff_role in interaction.user.roles:
+    # Check for the staff role first (cheap ID lookup), then for administrator permissions
+    if is_staff_member(interaction.user, interaction_settings(interaction).get('staff_role')):
         return True
 
     # If neither, send a denial message and return False
-    await send_embed_response(interaction, "Permission Denied", "This command is reserved for staff members only.", discord.Color.red()); return False
+    await send_embed(interaction, EMBED_STAFF_ONLY); return False
 
 def is_staff_check():
     """Decorator to apply the is_staff_interaction check to an application command."""
@@ -1152,11 +1627,11 @@ def is_staff_check():
 def in_ticket_channel_check():
     """Decorator to check if a command is used within an open ticket channel."""
     async def predicate(interaction: discord.Interaction) -> bool:
-        settings = bot.get_guild_settings(interaction.guild.id)
+        settings = interaction_settings(interaction) # Shared with is_staff_check
         # Check if the channel's category matches the configured ticket category
         if interaction.channel and interaction.channel.category_id == settings.get('ticket_category'):
             return True
-        await send_embed_response(interaction, "Invalid Channel", "This command can only be used within an open ticket channel.", discord.Color.red())
+        await send_embed(interaction, EMBED_NOT_TICKET_CHANNEL)
         return False
     return app_commands.check(predicate)
 
@@ -1172,11 +1647,11 @@ async def ticket_add(interaction: discord.Interaction, user: discord.Member):
     try:
         await interaction.channel.set_permissions(user, read_messages=True, send_messages=True, view_channel=True)
         # Send a non-ephemeral confirmation message to the channel
-        await send_embed_response(interaction, "User Added", f"{user.mention} has been added to this ticket by {interaction.user.mention}.", discord.Color.green(), ephemeral=False)
+        await send_embed_response(interaction, "User Added", f"{user.mention} has been added to this ticket by {interaction.user.mention}.", COLOR_GREEN, ephemeral=False)
     except discord.Forbidden:
-        await send_embed_response(interaction, "Permissions Error", "I lack the permission to modify channel permissions.", discord.Color.red())
+        await send_embed_response(interaction, "Permissions Error", "I lack the permission to modify channel permissions.", COLOR_RED)
     except Exception as e:
-        await send_embed_response(interaction, "Error", f"An unexpected error occurred: {e}", discord.Color.red())
+        await send_embed_response(interaction, "Error", f"An unexpected error occurred: {e}", COLOR_RED)
 
 @ticket_group.command(name="remove", description="Removes a user from the current ticket.")
 @app_commands.describe(user="The user to remove from this ticket.")
@@ -1187,11 +1662,11 @@ async def ticket_remove(interaction: discord.Interaction, user: discord.Member):
     try:
         # Resetting permissions for the user effectively removes them
         await interaction.channel.set_permissions(user, overwrite=None)
-        await send_embed_response(interaction, "User Removed", f"{user.mention} has been removed from this ticket by {interaction.user.mention}.", discord.Color.orange(), ephemeral=False)
+        await send_embed_response(interaction, "User Removed", f"{user.mention} has been removed from this ticket by {interaction.user.mention}.", COLOR_ORANGE, ephemeral=False)
     except discord.Forbidden:
-        await send_embed_response(interaction, "Permissions Error", "I lack the permission to modify channel permissions.", discord.Color.red())
+        await send_embed_response(interaction, "Permissions Error", "I lack the permission to modify channel permissions.", COLOR_RED)
     except Exception as e:
-        await send_embed_response(interaction, "Error", f"An unexpected error occurred: {e}", discord.Color.red())
+        await send_embed_response(interaction, "Error", f"An unexpected error occurred: {e}", COLOR_RED)
 
 @ticket_group.command(name="rename", description="Renames the current ticket channel.")
 @app_commands.describe(new_name="The new name for the ticket channel (spaces become hyphens).")
@@ -1201,30 +1676,28 @@ async def ticket_rename(interaction: discord.Interaction, new_name: str):
     """Renames the current ticket channel."""
     try:
         # Sanitize the new name for channel naming rules
-        clean_name = "".join(c for c in new_name if c.isalnum() or c in ('-','_ ')).replace(' ','-').lower()[:100]
+        clean_name = new_name.translate(RENAME_TABLE).lower()[:100]
         # Provide a fallback name if the sanitized name is empty
         if not clean_name:
             clean_name = f"ticket-{interaction.channel.id}"
 
-        await interaction.channel.edit(name=clean_name, reason=f"Renamed by {interaction.user.name}")
-        await send_embed_response(interaction, "Ticket Renamed", f"The channel has been renamed to `{clean_name}`.", discord.Color.blue(), ephemeral=False)
+        if retry_after := await safe_channel_edit(interaction.channel, name=clean_name, reason=f"Renamed by {interaction.user.name}"):
+            await send_embed_response(interaction, "Rate Limited", f"Discord only allows 2 channel name/topic changes every 10 minutes. This ticket can be renamed again <t:{int(time.time() + retry_after)}:R>.", COLOR_ORANGE); return
+        await send_embed_response(interaction, "Ticket Renamed", f"The channel has been renamed to `{clean_name}`.", COLOR_BLUE, ephemeral=False)
     except discord.Forbidden:
-        await send_embed_response(interaction, "Permissions Error", "I lack the permission to rename this channel.", discord.Color.red())
+        await send_embed_response(interaction, "Permissions Error", "I lack the permission to rename this channel.", COLOR_RED)
     except Exception as e:
-        await send_embed_response(interaction, "Error", f"An unexpected error occurred while renaming: {e}", discord.Color.red())
+        await send_embed_response(interaction, "Error", f"An unexpected error occurred while renaming: {e}", COLOR_RED)
 
 @ticket_group.command(name="escalate", description="Pings the senior staff role in the current ticket.")
 @is_staff_check()
 @in_ticket_channel_check()
 async def ticket_escalate(interaction: discord.Interaction):
     """Pings the escalation role in the ticket."""
-    settings = bot.get_guild_settings(interaction.guild.id)
-    esc_role_id = settings.get("escalation_role")
-
-    if not esc_role_id or not (esc_role := interaction.guild.get_role(esc_role_id)):
-        await send_embed_response(interaction, "Configuration Error", "The escalation role is not set up correctly or cannot be found.", discord.Color.red()); return
+    if not (esc_role := bot.get_setting_role(interaction.guild, "escalation_role")):
+        await send_embed_response(interaction, "Configuration Error", "The escalation role is not set up correctly or cannot be found.", COLOR_RED); return
 
-    embed = create_embed("Ticket Escalated", f"🚨 This ticket requires senior attention! Escalated by {interaction.user.mention}. {esc_role.mention}, please assist.", discord.Color.red())
+    embed = create_embed("Ticket Escalated", f"🚨 This ticket requires senior attention! Escalated by {interaction.user.mention}. {esc_role.mention}, please assist.", COLOR_RED)
     try:
         # Defer ephemerally before sending the public ping
         await interaction.response.defer(ephemeral=True)
@@ -1233,9 +1706,9 @@ async def ticket_escalate(interaction: discord.Interaction):
         # Send a confirmation back to the staff member who used the command
         await interaction.followup.send("Escalation ping sent successfully.", ephemeral=True)
     except discord.Forbidden:
-        await send_embed_response(interaction, "Permissions Error", "I was unable to send a message or ping the role in this channel.", discord.Color.red())
+        await send_embed_response(interaction, "Permissions Error", "I was unable to send a message or ping the role in this channel.", COLOR_RED)
     except Exception as e:
-        await send_embed_response(interaction, "Error", f"An unexpected error occurred during escalation: {e}", discord.Color.red())
+        await send_embed_response(interaction, "Error", f"An unexpected error occurred during escalation: {e}", COLOR_RED)
 
 # End of Part 4/5
 # bot.py (Part 5/5)
@@ -1246,35 +1719,24 @@ async def ticket_escalate(interaction: discord.Interaction):
 async def ticket_claim(interaction: discord.Interaction):
     """Claims the current ticket."""
     current_topic = interaction.channel.topic or ""
-    if "claimed-by-" in current_topic:
-        # Extract claimer ID robustly
-        parts = current_topic.split(" ")
-        claimer_part = next((part for part in parts if part.startswith("claimed-by-")), None)
-        claimer_id_str = claimer_part.split("-")[-1] if claimer_part else None
-        claimer = "Unknown User"
-        if claimer_id_str and claimer_id_str.isdigit():
-             claimer_id = int(claimer_id_str)
-             claimer_member = interaction.guild.get_member(claimer_id)
-             # Use mention if member found, otherwise ID
-             claimer = claimer_member.mention if claimer_member else f"User ID: {claimer_id}"
-        await send_embed_response(interaction, "Already Claimed", f"This ticket is already claimed by {claimer}.", discord.Color.orange()); return
-
-    # Reconstruct topic preserving essential parts
-    topic_parts = current_topic.split(" ")
-    # Find the user ID part
-    base_topic = next((part for part in topic_parts if part.startswith("ticket-user-")), f"ticket-user-{interaction.channel.id}")
-    # Find the type part
-    type_topic = next((part for part in topic_parts if part.startswith("type-")), "")
-    # Combine parts and add claimer, ensure within topic length limit
-    new_topic = f"{base_topic} {type_topic} claimed-by-{interaction.user.id}".strip()[:1024]
+    claimer_id = parse_claimer(current_topic)
+    if claimer_id:
+        claimer_member = interaction.guild.get_member(claimer_id)
+        # Use mention if member found, otherwise ID
+        claimer = claimer_member.mention if claimer_member else f"User ID: {claimer_id}"
+        await send_embed_response(interaction, "Already Claimed", f"This ticket is already claimed by {claimer}.", COLOR_ORANGE); return
+
+    # Reconstruct topic preserving the user/type markers and add the claimer
+    new_topic = build_ticket_topic(current_topic, interaction.channel.id, interaction.user.id)
 
     try:
-        await interaction.channel.edit(topic=new_topic, reason=f"Claimed by {interaction.user.name}")
-        await send_embed_response(interaction, "Ticket Claimed", f"🎫 {interaction.user.mention} has claimed this ticket.", discord.Color.green(), ephemeral=False)
+        if retry_after := await safe_channel_edit(interaction.channel, topic=new_topic, reason=f"Claimed by {interaction.user.name}"):
+            await send_embed_response(interaction, "Rate Limited", f"Discord only allows 2 channel name/topic changes every 10 minutes. This ticket can be claimed again <t:{int(time.time() + retry_after)}:R>.", COLOR_ORANGE); return
+        await send_embed_response(interaction, "Ticket Claimed", f"🎫 {interaction.user.mention} has claimed this ticket.", COLOR_GREEN, ephemeral=False)
     except discord.Forbidden:
-        await send_embed_response(interaction, "Permissions Error", "I cannot edit the channel topic.", discord.Color.red())
+        await send_embed_response(interaction, "Permissions Error", "I cannot edit the channel topic.", COLOR_RED)
     except Exception as e:
-        await send_embed_response(interaction, "Error", f"Failed to claim ticket: {e}", discord.Color.red())
+        await send_embed_response(interaction, "Error", f"Failed to claim ticket: {e}", COLOR_RED)
 
 @ticket_group.command(name="unclaim", description="Releases the current ticket back to the queue.")
 @is_staff_check()
@@ -1282,58 +1744,52 @@ async def ticket_claim(interaction: discord.Interaction):
 async def ticket_unclaim(interaction: discord.Interaction):
     """Unclaims the current ticket."""
     current_topic = interaction.channel.topic or ""
-    if "claimed-by-" not in current_topic:
-        await send_embed_response(interaction, "Not Claimed", "This ticket is not currently claimed.", discord.Color.orange()); return
-
-    parts = current_topic.split(" ")
-    claimer_part = next((part for part in parts if part.startswith("claimed-by-")), None)
-    claimer_id_str = claimer_part.split("-")[-1] if claimer_part else None
-    claimer_id = None
-    if claimer_id_str and claimer_id_str.isdigit(): claimer_id = int(claimer_id_str)
-
+    claimer_id = parse_claimer(current_topic)
     if not claimer_id:
-        # If claimer ID can't be found, maybe just allow any staff to unclaim? Or deny? Deny for safety.
-        await send_embed_response(interaction, "Error", "Could not identify the original claimer from the channel topic.", discord.Color.red()); return
+        if "claimed-by-" in current_topic: # Marker present but its ID doesn't parse: a corrupted claim, not an unclaimed ticket
+            await send_embed_response(interaction, "Error", "Could not identify the original claimer from the channel topic.", COLOR_RED); return
+        await send_embed_response(interaction, "Not Claimed", "This ticket is not currently claimed.", COLOR_ORANGE); return
 
     # Ensure interaction user is a member
     if not isinstance(interaction.user, discord.Member):
-         await send_embed_response(interaction, "Error", "Could not verify permissions.", discord.Color.red()); return
+         await send_embed(interaction, EMBED_CANNOT_VERIFY); return
 
     is_admin = interaction.user.guild_permissions.administrator
     # Allow original claimer OR admin to unclaim
     if interaction.user.id != claimer_id and not is_admin:
         claimer = interaction.guild.get_member(claimer_id) or f"User ID: {claimer_id}"
-        await send_embed_response(interaction, "Permission Denied", f"This ticket is claimed by {claimer}. Only they or an administrator can unclaim it.", discord.Color.red()); return
+        await send_embed_response(interaction, "Permission Denied", f"This ticket is claimed by {claimer}. Only they or an administrator can unclaim it.", COLOR_RED); return
 
     # Reconstruct topic without claimer part
-    base_topic = next((part for part in parts if part.startswith("ticket-user-")), f"ticket-user-{interaction.channel.id}")
-    type_topic = next((part for part in parts if part.startswith("type-")), "")
-    new_topic = f"{base_topic} {type_topic}".strip()[:1024]
+    new_topic = build_ticket_topic(current_topic, interaction.channel.id)
 
     try:
-        await interaction.channel.edit(topic=new_topic, reason=f"Unclaimed by {interaction.user.name}")
-        await send_embed_response(interaction, "Ticket Unclaimed", f"🔓 {interaction.user.mention} has unclaimed this ticket. It is now open for any staff member.", discord.Color.blue(), ephemeral=False)
+        if retry_after := await safe_channel_edit(interaction.channel, topic=new_topic, reason=f"Unclaimed by {interaction.user.name}"):
+            await send_embed_response(interaction, "Rate Limited", f"Discord only allows 2 channel name/topic changes every 10 minutes. This ticket can be unclaimed again <t:{int(time.time() + retry_after)}:R>.", COLOR_ORANGE); return
+        await send_embed_response(interaction, "Ticket Unclaimed", f"🔓 {interaction.user.mention} has unclaimed this ticket. It is now open for any staff member.", COLOR_BLUE, ephemeral=False)
     except discord.Forbidden:
-        await send_embed_response(interaction, "Permissions Error", "I cannot edit the channel topic.", discord.Color.red())
+        await send_embed_response(interaction, "Permissions Error", "I cannot edit the channel topic.", COLOR_RED)
     except Exception as e:
-        await send_embed_response(interaction, "Error", f"Failed to unclaim ticket: {e}", discord.Color.red())
+        await send_embed_response(interaction, "Error", f"Failed to unclaim ticket: {e}", COLOR_RED)
 
-@ticket_group.command(name="purge", description="Deletes messages in the ticket (max 100).")
-@app_commands.describe(amount="Number of messages to delete (1-100).")
+@ticket_group.command(name="purge", description="Deletes messages in the ticket (max 1000).")
+@app_commands.describe(amount="Number of messages to delete (1-1000).")
 @is_staff_check()
 @in_ticket_channel_check()
-async def ticket_purge(interaction: discord.Interaction, amount: app_commands.Range[int, 1, 100]):
+async def ticket_purge(interaction: discord.Interaction, amount: app_commands.Range[int, 1, 1000]):
     """Deletes messages in the current ticket channel."""
     # Defer ephemerally before purging
     await interaction.response.defer(ephemeral=True, thinking=True)
     try:
-        # Slash commands don't have a visible trigger message, so limit is just amount
-        deleted = await interaction.channel.purge(limit=amount)
-        await interaction.followup.send(embed=create_embed("Messages Purged", f"🗑️ Successfully deleted {len(deleted)} messages.", discord.Color.green()), ephemeral=True)
+        # Slash commands don't have a visible trigger message, so limit is just amount.
+        # With bulk=True, purge pages history and bulk-deletes 100 messages per request
+        # (messages older than 14 days can't be bulk-deleted and are removed one by one)
+        deleted = await interaction.channel.purge(limit=amount, bulk=True, reason=f"Purge by {interaction.user.name} ({interaction.user.id})")
+        await interaction.followup.send(embed=create_embed("Messages Purged", f"🗑️ Successfully deleted {len(deleted)} messages.", COLOR_GREEN), ephemeral=True)
     except discord.Forbidden:
-        await interaction.followup.send(embed=create_embed("Permissions Error", "I lack the required permission to delete messages in this channel.", discord.Color.red()), ephemeral=True)
+        await interaction.followup.send(embed=create_embed("Permissions Error", "I lack the required permission to delete messages in this channel.", COLOR_RED), ephemeral=True)
     except Exception as e:
-        await interaction.followup.send(embed=create_embed("Error", f"An unexpected error occurred during purge: {e}", discord.Color.red()), ephemeral=True)
+        await interaction.followup.send(embed=create_embed("Error", f"An unexpected error occurred during purge: {e}", COLOR_RED), ephemeral=True)
 
 @ticket_group.command(name="slowmode", description="Sets slowmode in the current ticket channel.")
 @app_commands.describe(delay="Slowmode delay in seconds (0 to disable, max 21600).")
@@ -1345,11 +1801,11 @@ async def ticket_slowmode(interaction: discord.Interaction, delay: app_commands.
         await interaction.channel.edit(slowmode_delay=delay, reason=f"Slowmode set by {interaction.user.name}")
         status = f"disabled" if delay == 0 else f"set to {delay} seconds"
         # Send non-ephemeral confirmation
-        await send_embed_response(interaction, "Slowmode Updated", f"⏳ Slowmode has been {status} for this ticket channel.", discord.Color.blue(), ephemeral=False)
+        await send_embed_response(interaction, "Slowmode Updated", f"⏳ Slowmode has been {status} for this ticket channel.", COLOR_BLUE, ephemeral=False)
     except discord.Forbidden:
-        await send_embed_response(interaction, "Permissions Error", "I lack the permission to change the slowmode setting.", discord.Color.red())
+        await send_embed_response(interaction, "Permissions Error", "I lack the permission to change the slowmode setting.", COLOR_RED)
     except Exception as e:
-        await send_embed_response(interaction, "Error", f"An unexpected error occurred setting slowmode: {e}", discord.Color.red())
+        await send_embed_response(interaction, "Error", f"An unexpected error occurred setting slowmode: {e}", COLOR_RED)
 
 
 # --- MODERATION COMMANDS (Now under /mod group) ---
@@ -1359,37 +1815,35 @@ async def ticket_slowmode(interaction: discord.Interaction, delay: app_commands.
 @app_commands.checks.has_permissions(administrator=True) # Admin only check
 async def mod_blacklist(interaction: discord.Interaction, user: discord.Member, reason: str):
     """Blacklists a user."""
-    if user.id == interaction.user.id: await send_embed_response(interaction, "Action Denied", "You cannot blacklist yourself.", discord.Color.orange()); return
-    if user.bot: await send_embed_response(interaction, "Action Denied", "Bots cannot be blacklisted.", discord.Color.orange()); return
+    if user.id == interaction.user.id: await send_embed_response(interaction, "Action Denied", "You cannot blacklist yourself.", COLOR_ORANGE); return
+    if user.bot: await send_embed_response(interaction, "Action Denied", "Bots cannot be blacklisted.", COLOR_ORANGE); return
     # Prevent blacklisting admins? Optional check.
-    # if user.guild_permissions.administrator: await send_embed_response(interaction, "Action Denied", "Administrators cannot be blacklisted.", discord.Color.orange()); return
+    # if user.guild_permissions.administrator: await send_embed_response(interaction, "Action Denied", "Administrators cannot be blacklisted.", COLOR_ORANGE); return
 
-    settings = bot.get_guild_settings(interaction.guild.id); user_id_str = str(user.id)
-    blacklist_dict = settings.setdefault("blacklist", {}) # Ensure dict exists
+    blacklist_dict = bot.get_guild_settings(interaction.guild.id)["blacklist"] # Keyed by int user ID
 
-    if user_id_str in blacklist_dict:
-        await send_embed_response(interaction, "Already Blacklisted", f"{user.mention} is already blacklisted for: `{blacklist_dict[user_id_str]}`.", discord.Color.orange()); return
+    if user.id in blacklist_dict:
+        await send_embed_response(interaction, "Already Blacklisted", f"{user.mention} is already blacklisted for: `{blacklist_dict[user.id]}`.", COLOR_ORANGE); return
 
     # Ensure reason isn't excessively long
     reason = reason[:500] + "..." if len(reason) > 500 else reason
-    blacklist_dict[user_id_str] = reason
-    bot.update_guild_setting(interaction.guild.id, "blacklist", blacklist_dict) # Update whole dict
-    await send_embed_response(interaction, "User Blacklisted", f"{user.mention} has been **blacklisted** from creating tickets.\nReason: `{reason}`.", discord.Color.red())
+    blacklist_dict[user.id] = reason
+    bot.mark_settings_dirty() # Dict was modified in place; just schedule a save
+    await send_embed_response(interaction, "User Blacklisted", f"{user.mention} has been **blacklisted** from creating tickets.\nReason: `{reason}`.", COLOR_RED)
 
 @mod_group.command(name="unblacklist", description="Removes a user from the ticket blacklist.")
 @app_commands.describe(user="The user to unblacklist.")
 @app_commands.checks.has_permissions(administrator=True) # Admin only check
 async def mod_unblacklist(interaction: discord.Interaction, user: discord.Member):
     """Unblacklists a user."""
-    settings = bot.get_guild_settings(interaction.guild.id); user_id_str = str(user.id)
-    blacklist_dict = settings.get("blacklist", {})
+    blacklist_dict = bot.get_guild_settings(interaction.guild.id)["blacklist"] # Keyed by int user ID
 
-    if user_id_str not in blacklist_dict:
-        await send_embed_response(interaction, "Not Found", f"{user.mention} is not currently blacklisted.", discord.Color.orange()); return
+    if user.id not in blacklist_dict:
+        await send_embed_response(interaction, "Not Found", f"{user.mention} is not currently blacklisted.", COLOR_ORANGE); return
 
-    del blacklist_dict[user_id_str] # Remove from the dict
-    bot.update_guild_setting(interaction.guild.id, "blacklist", blacklist_dict) # Save modified dict
-    await send_embed_response(interaction, "User Unblacklisted", f"{user.mention} has been **unblacklisted** and can now create tickets.", discord.Color.green())
+    del blacklist_dict[user.id] # Remove from the dict
+    bot.mark_settings_dirty() # Dict was modified in place; just schedule a save
+    await send_embed_response(interaction, "User Unblacklisted", f"{user.mention} has been **unblacklisted** and can now create tickets.", COLOR_GREEN)
 
 @mod_group.command(name="announce", description="Sends an announcement (plain text, image, or JSON embed).")
 @app_commands.describe(
@@ -1407,37 +1861,37 @@ async def mod_announce(interaction: discord.Interaction, channel: discord.TextCh
 
     # 1. Process JSON if provided (highest priority)
     if json_file:
-        if not json_file.filename.lower().endswith('.json'): await interaction.followup.send(embed=create_embed("Error", "Invalid file type. Please attach a `.json` file for embeds.", discord.Color.red()), ephemeral=True); return
+        if not json_file.filename.lower().endswith('.json'): await interaction.followup.send(embed=create_embed("Error", "Invalid file type. Please attach a `.json` file for embeds.", COLOR_RED), ephemeral=True); return
         try:
-            json_bytes = await json_file.read(); embed_data = json.loads(json_bytes.decode('utf-8'))
+            json_bytes = await json_file.read(); embed_data = json_loads(json_bytes)
             if not isinstance(embed_data, dict): raise ValueError("JSON must be an object (dictionary).")
             # Create embed from dict, let discord.py handle validation
             embed_to_send = discord.Embed.from_dict(embed_data)
             content_to_send = None; image_file = None # Ignore others
-            print(f"[INFO] Loaded embed from {json_file.filename} for announcement.")
-        except Exception as e: await interaction.followup.send(embed=create_embed("JSON Error", f"Failed to process JSON file: {e}", discord.Color.red()), ephemeral=True); return
+            log.info("Loaded embed from %s for announcement.", json_file.filename)
+        except Exception as e: await interaction.followup.send(embed=create_embed("JSON Error", f"Failed to process JSON file: {e}", COLOR_RED), ephemeral=True); return
 
     # 2. Process Image if provided (and no JSON)
     elif image_file:
         if not image_file.content_type or not image_file.content_type.startswith("image/"):
-            await interaction.followup.send(embed=create_embed("Error", "Invalid file type. Please attach an image file.", discord.Color.red()), ephemeral=True); return
+            await interaction.followup.send(embed=create_embed("Error", "Invalid file type. Please attach an image file.", COLOR_RED), ephemeral=True); return
         try:
             image_bytes = await image_file.read()
             file_to_send = discord.File(io.BytesIO(image_bytes), filename=image_file.filename)
-            print(f"[INFO] Prepared image file: {image_file.filename} for announcement.")
-        except Exception as e: await interaction.followup.send(embed=create_embed("Error", f"Failed to read image attachment: {e}", discord.Color.red()), ephemeral=True); return
+            log.info("Prepared image file: %s for announcement.", image_file.filename)
+        except Exception as e: await interaction.followup.send(embed=create_embed("Error", f"Failed to read image attachment: {e}", COLOR_RED), ephemeral=True); return
 
     # 3. Check if there's anything to send
     if embed_to_send is None and content_to_send is None and file_to_send is None:
-         await interaction.followup.send(embed=create_embed("Error", "Nothing to announce. Please provide message text, attach an image, or attach a JSON embed file.", discord.Color.orange()), ephemeral=True); return
+         await interaction.followup.send(embed=create_embed("Error", "Nothing to announce. Please provide message text, attach an image, or attach a JSON embed file.", COLOR_ORANGE), ephemeral=True); return
 
     # 4. Send the announcement
     try:
         await channel.send(content=content_to_send, embed=embed_to_send, file=file_to_send)
-        await interaction.followup.send(embed=create_embed("Announcement Sent", f"Your message has been delivered to {channel.mention}.", discord.Color.green()), ephemeral=True)
-    except discord.Forbidden: await interaction.followup.send(embed=create_embed("Permissions Error", f"I do not have permission to send messages (or files/embeds) in {channel.mention}.", discord.Color.red()), ephemeral=True)
-    except discord.HTTPException as e: await interaction.followup.send(embed=create_embed("Send Error", f"Failed to send message/embed: {e}", discord.Color.red()), ephemeral=True)
-    except Exception as e: print(f"[ERROR] Announce send failed: {e}"); traceback.print_exc(); await interaction.followup.send(embed=create_embed("Error", "An unexpected error occurred during sending.", discord.Color.red()), ephemeral=True)
+        await interaction.followup.send(embed=create_embed("Announcement Sent", f"Your message has been delivered to {channel.mention}.", COLOR_GREEN), ephemeral=True)
+    except discord.Forbidden: await interaction.followup.send(embed=create_embed("Permissions Error", f"I do not have permission to send messages (or files/embeds) in {channel.mention}.", COLOR_RED), ephemeral=True)
+    except discord.HTTPException as e: await interaction.followup.send(embed=create_embed("Send Error", f"Failed to send message/embed: {e}", COLOR_RED), ephemeral=True)
+    except Exception as e: log.exception("Announce send failed: %s", e); await interaction.followup.send(embed=create_embed("Error", "An unexpected error occurred during sending.", COLOR_RED), ephemeral=True)
 
 
 # --- UTILITY COMMANDS (Now under /info group) ---
@@ -1447,9 +1901,9 @@ async def mod_announce(interaction: discord.Interaction, channel: discord.TextCh
 async def userinfo(interaction: discord.Interaction, member: discord.Member = None):
     """Shows details about a user."""
     # Ensure command is used in a guild
-    if not interaction.guild: await send_embed_response(interaction, "Error", "Command unavailable in DMs.", discord.Color.red()); return
+    if not interaction.guild: await send_embed_response(interaction, "Error", "Command unavailable in DMs.", COLOR_RED); return
     target = member or interaction.user # Target is Member type
-    embed = discord.Embed(title=f"User Information", description=f"Details for {target.mention}", color=target.color or discord.Color.blue(), timestamp=discord.utils.utcnow())
+    embed = discord.Embed(title=f"User Information", description=f"Details for {target.mention}", color=target.color or COLOR_BLUE, timestamp=discord.utils.utcnow())
     if target.avatar: embed.set_thumbnail(url=target.avatar.url)
     embed.set_author(name=str(target), icon_url=target.display_avatar.url) # Use display_avatar
 
@@ -1478,9 +1932,9 @@ async def userinfo(interaction: discord.Interaction, member: discord.Member = No
 @utility_group.command(name="serverinfo", description="Displays information about the current server.")
 async def serverinfo(interaction: discord.Interaction):
     """Shows details about the server."""
-    if not interaction.guild: await send_embed_response(interaction, "Error", "Command unavailable in DMs.", discord.Color.red()); return
+    if not interaction.guild: await send_embed_response(interaction, "Error", "Command unavailable in DMs.", COLOR_RED); return
     guild = interaction.guild
-    embed = discord.Embed(title=f"Server Information", description=f"Details for **{guild.name}**", color=discord.Color.blurple(), timestamp=discord.utils.utcnow())
+    embed = discord.Embed(title=f"Server Information", description=f"Details for **{guild.name}**", color=COLOR_BLURPLE, timestamp=discord.utils.utcnow())
     if guild.icon: embed.set_thumbnail(url=guild.icon.url)
     if guild.banner: embed.set_image(url=guild.banner.url) # Show banner if available
 
@@ -1518,18 +1972,16 @@ async def ticket_stats(interaction: discord.Interaction):
     settings = bot.get_guild_settings(interaction.guild.id)
     total_created = settings.get("ticket_counter", 1) - 1
     ticket_category_id = settings.get("ticket_category")
-    open_tickets = 0
+    open_tickets = bot.count_open_tickets(interaction.guild.id) # Maintained by the ticket index
 
     if ticket_category_id:
-        ticket_category = interaction.guild.get_channel(ticket_category_id)
-        if ticket_category and isinstance(ticket_category, discord.CategoryChannel):
-            open_tickets = len(ticket_category.text_channels) # Count text channels
-        else: await interaction.followup.send(embed=create_embed("Warning", "Ticket category invalid.", discord.Color.orange()), ephemeral=True)
+        if not bot.get_setting_category(interaction.guild, "ticket_category"):
+            await interaction.followup.send(embed=create_embed("Warning", "Ticket category invalid.", COLOR_ORANGE), ephemeral=True)
 
-    embed = discord.Embed(title=f"Ticket Statistics: {interaction.guild.name}", color=discord.Color.light_grey())
+    embed = discord.Embed(title=f"Ticket Statistics: {interaction.guild.name}", color=COLOR_LIGHT_GREY)
     embed.add_field(name="Total Tickets Created", value=f"**{total_created}**", inline=True);
     embed.add_field(name="Currently Open Tickets", value=f"**{open_tickets}**", inline=True)
-    embed.set_footer(text="Counts include all ticket types within the category.")
+    embed.set_footer(text="Open count: indexed open tickets (channels in the ticket category with a ticket marker), all types.")
     await interaction.followup.send(embed=embed, ephemeral=True) # Send stats ephemerally
 
 # --- Register Command Groups with the Bot's Command Tree ---
@@ -1543,16 +1995,15 @@ bot.tree.add_command(utility_group) # Register the new utility group
 if __name__ == "__main__": # Standard Python entry point check
     try:
         # Run the bot with the token
-        # Removed custom logging setup for simplicity, discord.py has default logging
-        print("[INFO] Starting bot...")
-        bot.run(TOKEN)
+        # Logging is configured above; log_handler=None stops discord.py adding a second handler
+        log.info("Starting bot...")
+        bot.run(TOKEN, log_handler=None)
     except discord.errors.LoginFailure:
-        print("[CRITICAL ERROR] Login Failure: Improper token passed. Verify DISCORD_TOKEN.")
+        log.critical("Login Failure: Improper token passed. Verify DISCORD_TOKEN.")
     except discord.errors.PrivilegedIntentsRequired:
-        print("[CRITICAL ERROR] Privileged Intents Required: Ensure Presence, Server Members, and Message Content intents are enabled in the Discord Developer Portal.")
+        log.critical("Privileged Intents Required: Ensure Presence, Server Members, and Message Content intents are enabled in the Discord Developer Portal.")
     except Exception as e:
         # Catch any other exceptions during startup
-        print(f"[CRITICAL ERROR] Bot failed to start: {e}")
-        traceback.print_exc()
+        log.critical("Bot failed to start: %s", e, exc_info=True)
 
 # End of Part 5/5
\ No newline at end of file